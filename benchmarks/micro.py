@@ -0,0 +1,223 @@
+"""
+Micro-benchmarks behind the decisions to keep builtins as they are.
+
+Every benchmark times the current implementation against the proposed one on
+the same input. Run all of them, or only those whose names are given:
+
+    python benchmarks/micro.py [append reverse ...]
+"""
+
+import argparse
+import io
+import random
+import string
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import mpmath as mpm
+from mpmath.libmp import from_float
+
+from numfu.ast_types import Call, Number, Variable
+
+Num = mpm.mpf
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def timed(stmt, number: int | None = None, **namespace) -> float:
+    """Best time of one execution of `stmt` in seconds, out of five runs"""
+    timer = timeit.Timer(stmt, globals=namespace)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(5, number)) / number
+
+
+def report(label: str, seconds: float):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6), ("ns", 1e9)):
+        if seconds * scale >= 1 or unit == "ns":
+            print(f"  {label:<48} {seconds * scale:8.2f} {unit}")
+            return
+
+
+@benchmark
+def append():
+    """append and List + List copy their operands (chunk1-12, chunk2-3)"""
+    a = [Num(i) for i in range(1000)]
+    b = Num(1)
+    report("a + [b], current", timed("a + [b]", a=a, b=b))
+    report("a.copy() + append(b)", timed("c = a.copy(); c.append(b)", a=a, b=b))
+    report("a + a, current", timed("a + a", a=a))
+    report(
+        "preallocate and assign slices",
+        timed("c = [None] * (2 * n); c[:n] = a; c[n:] = a", a=a, n=len(a)),
+    )
+
+
+@benchmark
+def reverse():
+    """reverse slices strings (chunk1-14)"""
+    s = "".join(random.choices(string.ascii_letters, k=100))
+    report("s[::-1], current", timed("s[::-1]", s=s))
+    report("s.encode()[::-1].decode()", timed("s.encode()[::-1].decode()", s=s))
+
+
+@benchmark
+def power():
+    """^ leaves integer exponents to mpmath (chunk1-15)"""
+    mpm.mp.prec = 53
+    x = Num(random.random())
+    report("x ** 2, current", timed("x ** 2", x=x))
+    report("x * x", timed("x * x", x=x))
+
+    values = [Num(random.uniform(-100, 100)) for _ in range(10000)]
+    differ = sum(v**3 != v * v * v for v in values)
+    print(f"  x * x * x differs from x ** 3 for {differ / len(values):.0%} of values")
+
+
+@benchmark
+def number_lists():
+    """number lists hold mpf objects (chunk2-12)"""
+    values = [Num(random.random()) for _ in range(100000)]
+    tuples = [v._mpf_ for v in values]
+    report("reverse the list, current", timed("values[::-1]", 10, values=values))
+    report(
+        "rebuild mpf objects from _mpf_",
+        timed("[rebuild(t) for t in tuples]", 10, rebuild=_rebuild, tuples=tuples),
+    )
+
+
+def _rebuild(t):
+    # the fastest way to make an mpf, without any conversion or rounding
+    x = object.__new__(Num)
+    x._mpf_ = t
+    return x
+
+
+@benchmark
+def format():
+    """format calls str.format (chunk2-13)"""
+    template = "{} and {} make {}"
+    args = ("1", "2", "3")
+    parsed = list(string.Formatter().parse(template))
+    report(
+        "str.format, current",
+        timed("template.format(*args)", template=template, args=args),
+    )
+    report(
+        "splice a cached Formatter.parse",
+        timed("splice(parsed, args)", splice=_splice, parsed=parsed, args=args),
+    )
+
+
+def _splice(parsed, args):
+    out = []
+    i = 0
+    for literal, field, _, _ in parsed:
+        out.append(literal)
+        if field is not None:
+            out.append(args[i])
+            i += 1
+    return "".join(out)
+
+
+@benchmark
+def join():
+    """join calls str.join (chunk2-14)"""
+    strings = ["".join(random.choices(string.ascii_letters, k=8)) for _ in range(1000)]
+    report("str.join, current", timed("''.join(strings)", strings=strings))
+    report("StringIO", timed("stringio(strings)", stringio=_stringio, strings=strings))
+
+
+def _stringio(strings):
+    buffer = io.StringIO()
+    for s in strings:
+        buffer.write(s)
+    return buffer.getvalue()
+
+
+@benchmark
+def operators():
+    """+ and * have no zero or one shortcuts (chunk2-19)"""
+    a, b = Num(3), Num(0)
+    report("a + 0 through mpf.__add__", timed("a + b", a=a, b=b))
+
+    def add(a, b):
+        if b == 0 and type(a) is Num:
+            return a
+        return a + b
+
+    c = Num(4)
+    report("a + b through a checking wrapper", timed("add(a, c)", add=add, a=a, c=c))
+    report("a + b, current", timed("a + c", a=a, c=c))
+
+
+@benchmark
+def map_calls():
+    """map builds its Call nodes with a comprehension (chunk2-20)"""
+    f = Variable("f")
+    elements = [Number(str(i)) for i in range(10000)]
+    report(
+        "list comprehension, current",
+        timed(
+            "[Call(f, [e]) for e in elements]", 20, Call=Call, f=f, elements=elements
+        ),
+    )
+    report(
+        "preallocated list",
+        timed("prealloc(f, elements)", 20, prealloc=_prealloc, f=f, elements=elements),
+    )
+
+
+def _prealloc(f, elements):
+    calls = [None] * len(elements)
+    for i in range(len(elements)):
+        calls[i] = Call(f, [elements[i]])
+    return calls
+
+
+@benchmark
+def random_numbers():
+    """random converts random.random() (chunk2-21)"""
+    report("random.random()", timed("random()", random=random.random))
+    report(
+        "mpf(random.random()), current",
+        timed("Num(random())", Num=Num, random=random.random),
+    )
+
+    def by_hand():
+        x = object.__new__(Num)
+        x._mpf_ = from_float(random.random(), mpm.mp.prec, "n")
+        return x
+
+    report("mpf built from libmp.from_float", timed("by_hand()", by_hand=by_hand))
+
+
+@benchmark
+def overloads():
+    """reverse and slice check isinstance(a, str) (chunk2-22)"""
+    report("isinstance(a, str)", timed("isinstance(a, str)", a=[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*", help=", ".join(BENCHMARKS))
+    args = parser.parse_args()
+    if unknown := set(args.names) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    random.seed(0)
+    print(f"Python {sys.version.split()[0]}, mpmath backend {mpm.libmp.BACKEND}")
+    for name in args.names or BENCHMARKS:
+        print(f"{name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
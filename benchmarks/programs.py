@@ -0,0 +1,161 @@
+"""
+Profiles of NumFu programs behind the decisions to keep the interpreter's data
+structures as they are. Run all of them, or only those whose names are given:
+
+    python benchmarks/programs.py [environments operands ...]
+"""
+
+import argparse
+import cProfile
+import math
+import pstats
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from numfu import jit
+from numfu.ast_types import List
+from numfu.builtins import Builtins, Num, Std
+from numfu.interpreter import Interpreter
+from numfu.parser import Parser
+
+WORKLOAD = Path(__file__).parent / "workload.nfu"
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def run(code: str, path: str | Path = "<benchmark>", profile: bool = False):
+    """Run a program without printing, and return its profile if asked to"""
+    tree = Parser(fatal=True).parse(code, path=path)
+    interpreter = Interpreter(_print=False)
+    profiler = cProfile.Profile() if profile else None
+    if profiler:
+        profiler.enable()
+    interpreter.run(tree, path=path, code=code)
+    if profiler:
+        profiler.disable()
+        return pstats.Stats(profiler)
+
+
+def instrument(builtin, wrap):
+    """Replace the implementation of every overload of `builtin` by wrap(func)"""
+    wrapped = {}
+    for i, (*head, func, help, validators, transformer) in enumerate(
+        builtin._overloads
+    ):
+        wrapped[func] = wrap(func)
+        builtin._overloads[i] = (*head, wrapped[func], help, validators, transformer)
+    for key, overload in builtin._cache.items():
+        builtin._cache[key] = (*overload[:2], wrapped[overload[2]], *overload[3:])
+    for key, func in builtin.resolved.items():
+        builtin.resolved[key] = wrapped[func]
+
+
+def total_time(stats: pstats.Stats, names: tuple[str, ...]) -> float:
+    return sum(
+        tottime
+        for (_, _, name), (_, _, tottime, _, _) in stats.stats.items()  # type: ignore
+        if name in names
+    )
+
+
+@benchmark
+def accumulator():
+    """List.elements stays a Python list (chunk0-17)"""
+    stats = run(
+        'import append from "std"\n'
+        "let build = {n, acc -> if n == 0 then acc else build(n - 1, append(acc, n))}"
+        " in build(5000, [])",
+        profile=True,
+    )
+    print("  functions with the most own time in an accumulation of 5000 appends:")
+    stats.sort_stats("tottime").print_stats(8)  # type: ignore
+
+
+@benchmark
+def append_refcount():
+    """append copies its list argument (chunk2-3)"""
+    counts = []
+
+    def wrap(func):
+        def append(a, b):
+            counts.append(sys.getrefcount(a))
+            return func(a, b)
+
+        return append
+
+    instrument(Std._append, wrap)
+    run(
+        'import append from "std"\n'
+        "let build = {n, acc -> if n == 0 then acc else build(n - 1, append(acc, n))}"
+        " in build(200, [])"
+    )
+    print(f"  references to the accumulator: {min(counts)} to {max(counts)}")
+    Std._append._overloads[0][2](List([]), Num(1))
+    print(f"  references to a list nothing else holds: {counts[-1]}")
+
+
+@benchmark
+def operands():
+    """+ and * have no zero or one shortcuts (chunk2-19)"""
+    calls = {"+": [0, 0], "*": [0, 0]}
+
+    def counting(symbol, neutral):
+        def wrap(func):
+            def count(*args):
+                calls[symbol][0] += 1
+                calls[symbol][1] += any(type(a) is Num and a == neutral for a in args)
+                return func(*args)
+
+            return count
+
+        return wrap
+
+    instrument(Builtins._add, counting("+", 0))
+    instrument(Builtins._mul, counting("*", 1))
+    # compiled lambdas inline the operators, count every call in the interpreter
+    jit.THRESHOLD = math.inf
+    run(WORKLOAD.read_text(), path=WORKLOAD)
+    for symbol, neutral in (("+", 0), ("*", 1)):
+        total, hits = calls[symbol]
+        print(f"  {hits} of {total} calls of {symbol} had an operand of {neutral}")
+
+
+@benchmark
+def environments():
+    """environments stay flat dicts (chunk4-5)"""
+    bindings = ", ".join(f"v{i} = {i}" for i in range(60))
+    stats = run(
+        f"let {bindings} in\n"
+        "let loop = {n -> if n == 0 then v59 else loop(n - 1)} in loop(20000)",
+        profile=True,
+    )
+    copies = total_time(
+        stats,
+        ("<method 'copy' of 'dict' objects>", "<method 'update' of 'dict' objects>"),
+    )
+    print(f"  dict.copy and dict.update: {copies * 1e3:.1f} ms")
+    print(f"  whole run: {stats.total_tt * 1e3:.1f} ms")  # type: ignore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*", help=", ".join(BENCHMARKS))
+    args = parser.parse_args()
+    if unknown := set(args.names) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    sys.setrecursionlimit(100000)
+    print(f"Python {sys.version.split()[0]}")
+    for name in args.names or BENCHMARKS:
+        print(f"{name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmarks behind the decisions on how syntax trees are stored and loaded.
+
+The input is the syntax tree of every test program, the same trees that
+`numfu parse` writes to .nfut files and the parse cache stores. Run all of
+them, or only those whose names are given:
+
+    python benchmarks/trees.py [pickle_vs_parse mmap_load ...]
+"""
+
+import argparse
+import copyreg
+import dataclasses
+import io
+import mmap
+import pickle
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from numfu import ast_types
+from numfu.parser import Parser
+
+TESTS = Path(__file__).parent.parent / "tests"
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def timed(func, repeat: int = 5) -> float:
+    """Best time of `repeat` calls of `func` in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label: str, seconds: float):
+    print(f"  {label:<48} {seconds * 1e3:8.1f} ms")
+
+
+def sources() -> dict[Path, str]:
+    # the module error tests do not parse on purpose
+    return {
+        path: path.read_text()
+        for path in sorted(TESTS.rglob("*.nfu"))
+        if "errors" not in path.parts
+    }
+
+
+def dumps(tree, **options) -> bytes:
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    for name, value in options.items():
+        setattr(pickler, name, value)
+    pickler.dump(tree)
+    return buffer.getvalue()
+
+
+def _node(cls, values):
+    node = object.__new__(cls)
+    for field, value in zip(dataclasses.fields(cls), values):
+        object.__setattr__(node, field.name, value)
+    return node
+
+
+def _reduce(node):
+    fields = dataclasses.fields(node)
+    return _node, (type(node), tuple(getattr(node, f.name) for f in fields))
+
+
+@benchmark
+def pickle_vs_parse():
+    """.nfut files are pickles of the syntax tree (chunk2-7)"""
+    programs = sources()
+    parser = Parser(fatal=True)
+    trees = []
+
+    def parse():
+        trees[:] = [parser.parse(code, path=path) for path, code in programs.items()]
+
+    report(f"parse {len(programs)} test programs", timed(parse, 1))
+    data = dumps(trees)
+    print(f"  pickled trees: {len(data) / 1024:.0f} KB")
+    report("pickle.loads, current", timed(lambda: pickle.loads(data)))
+
+    # store nodes as tuples of their field values instead of slot states
+    table = copyreg.dispatch_table.copy()
+    for cls in vars(ast_types).values():
+        if isinstance(cls, type) and dataclasses.is_dataclass(cls):
+            table[cls] = _reduce
+    reduced = dumps(trees, dispatch_table=table)
+    print(f"  pickled with __reduce__ tuples: {len(reduced) / 1024:.0f} KB")
+    report("pickle.loads with __reduce__ tuples", timed(lambda: pickle.loads(reduced)))
+
+
+@benchmark
+def mmap_load():
+    """.nfut files and cached trees are loaded with read() (chunk2-11, chunk3-13)"""
+    parser = Parser(fatal=True)
+    programs = sources()
+    single = TESTS / "builtins.nfu"
+    files = {
+        "one test program": [parser.parse(programs[single], path=single)],
+        "all test programs": [
+            parser.parse(code, path=path) for path, code in programs.items()
+        ],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, tree in files.items():
+            path = Path(tmp) / "tree.nfut"
+            path.write_bytes(b"NFU-TREE-FILE" + dumps(tree))
+            print(f"  {label}: {path.stat().st_size / 1024:.0f} KB")
+            report(
+                "read_bytes() and pickle.loads, current",
+                timed(lambda path=path: _read(path)),
+            )
+            report("pickle.loads from an mmap", timed(lambda path=path: _mmap(path)))
+
+
+def _read(path: Path):
+    return pickle.loads(path.read_bytes()[len(b"NFU-TREE-FILE") :])
+
+
+def _mmap(path: Path):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        view = memoryview(m)
+        try:
+            return pickle.loads(view[len(b"NFU-TREE-FILE") :])
+        finally:
+            view.release()
+
+
+@benchmark
+def pickle_memo():
+    """trees are pickled with the memo (chunk3-20)"""
+    # one program, so that names and positions repeat as in a large file
+    code = "\n".join(
+        re.sub(r"^import .*$", "", code, flags=re.MULTILINE)
+        for code in sources().values()
+    )
+    tree = Parser(fatal=True).parse(code, path="all.nfu")
+    for label, fast in (("memo, current", False), ("Pickler.fast", True)):
+        data = dumps(tree, fast=fast)
+        print(f"  {label}: {len(data) / 1024:.0f} KB")
+        report("dump", timed(lambda fast=fast: dumps(tree, fast=fast)))
+        report("load", timed(lambda data=data: pickle.loads(data)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*", help=", ".join(BENCHMARKS))
+    args = parser.parse_args()
+    if unknown := set(args.names) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    sys.setrecursionlimit(100000)
+    print(f"Python {sys.version.split()[0]}")
+    for name in args.names or BENCHMARKS:
+        print(f"{name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,5 +12,8 @@ numfu tests/strings.nfu
 numfu tests/builtins.nfu
 numfu tests/modules/modules.nfu
 ./tests/modules/module_errors.sh
+./tests/output/output.sh
+./tests/cache/cache.sh
 numfu tests/edgecases.nfu
 numfu tests/recursion.nfu
+numfu tests/jit.nfu
@@ -3,12 +3,28 @@ This is a complete implementation of the NumFu programming language,
 including parser, AST types, interpreter, and command-line interface.
 """
 
-from . import ast_types, builtins
+import importlib
+
 from ._version import __author__, __version__
 from .cli import cli
-from .interpreter import Interpreter
-from .parser import Parser
-from .repl import REPL
+
+# loaded on first access, so that starting the CLI does not import them all
+_LAZY = {
+    "ast_types": None,
+    "builtins": None,
+    "Interpreter": "interpreter",
+    "Parser": "parser",
+    "REPL": "repl",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if (module := _LAZY[name]) is None:
+        return importlib.import_module(f".{name}", __name__)
+    return getattr(importlib.import_module(f".{module}", __name__), name)
+
 
 __all__ = [
     "Parser",
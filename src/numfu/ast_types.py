@@ -6,11 +6,16 @@ NumFu programs. All nodes inherit from the base Expr class and include
 position information for error reporting.
 """
 
+import sys
+from collections.abc import Callable
 from dataclasses import dataclass, field
-from typing import Callable
+from typing import Any
 
+import mpmath
+from lark import Tree
 
-@dataclass
+
+@dataclass(slots=True)
 class Pos:
     start: int | None = 0
     end: int | None = 1
@@ -18,15 +23,25 @@ class Pos:
     index: int | None = None
 
 
-DEFAULT_POS = field(default_factory=Pos, repr=False)
+# Shared by every node built without a position. Positions are only ever
+# written by the parser, which gives each top-level node its own Pos, so this
+# instance is never modified.
+NO_POS = Pos()
+
+
+def _no_pos() -> Pos:
+    return NO_POS
 
 
-@dataclass
+DEFAULT_POS = field(default_factory=_no_pos, repr=False)
+
+
+@dataclass(slots=True)
 class Expr:
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class PrintOutput(Expr):
     expr: Expr
     end: str = ""
@@ -36,7 +51,7 @@ class PrintOutput(Expr):
         return repr(self.expr)
 
 
-@dataclass
+@dataclass(slots=True)
 class Variable(Expr):
     name: str
     pos: Pos = DEFAULT_POS
@@ -46,15 +61,37 @@ class Variable(Expr):
             return "_"  # just a workaround, we need to block this somehow
         return f"Variable({self.name})"
 
+    @classmethod
+    def intern(cls, name: str) -> "Variable":
+        """Return a shared position-less instance, for nodes built outside the parser"""
+        if (node := _VARIABLE_CACHE.get(name)) is None:
+            node = _VARIABLE_CACHE[name] = cls(sys.intern(name))
+        return node
+
 
-@dataclass
+@dataclass(slots=True)
 class Number(Expr):
+    """
+    Args:
+        value: Literal as written in the source, kept for printing
+    """
+
     value: str
     pos: Pos = DEFAULT_POS
+    _mpf: Any = field(default=None, init=False, repr=False, compare=False)
+    _prec: int = field(default=0, init=False, repr=False, compare=False)
 
     def __repr__(self):
         return self.value.removesuffix(".0")
 
+    @property
+    def mpf(self) -> mpmath.mpf:
+        """The numeric value, converted once per working precision"""
+        if self._prec != mpmath.mp.prec:
+            self._mpf = mpmath.mpf(self.value)
+            self._prec = mpmath.mp.prec
+        return self._mpf
+
     def __eq__(self, other):
         if isinstance(other, Number):
             return self.value == other.value
@@ -62,7 +99,7 @@ class Number(Expr):
             return False
 
 
-@dataclass
+@dataclass(slots=True)
 class String(Expr):
     value: str
     pos: Pos = DEFAULT_POS
@@ -74,7 +111,7 @@ class String(Expr):
         return bool(self.value)
 
 
-@dataclass
+@dataclass(slots=True)
 class Bool(Expr):
     value: bool
     pos: Pos = DEFAULT_POS
@@ -85,8 +122,17 @@ class Bool(Expr):
     def __bool__(self):
         return self.value
 
+    @classmethod
+    def intern(cls, value: bool) -> "Bool":
+        """Return the shared position-less instance for `value`"""
+        return _BOOL_CACHE[bool(value)]
+
 
-@dataclass
+_VARIABLE_CACHE: dict[str, Variable] = {}
+_BOOL_CACHE = {True: Bool(True), False: Bool(False)}
+
+
+@dataclass(slots=True)
 class List(Expr):
     """
     Args:
@@ -120,26 +166,26 @@ class List(Expr):
             return False
 
 
-@dataclass
+@dataclass(slots=True)
 class Spread(Expr):
     expr: Expr
     pos: Pos = DEFAULT_POS
 
 
-@dataclass
+@dataclass(slots=True)
 class Import(Expr):
     names: list[Variable]
     module: str
     pos: Pos = DEFAULT_POS
 
 
-@dataclass
+@dataclass(slots=True)
 class Export(Expr):
     names: list[Variable]
     pos: Pos = DEFAULT_POS
 
 
-@dataclass
+@dataclass(slots=True)
 class InlineExport(Expr):
     """This type is only used temporarily in the parser and later resolved to a Constant and an Export"""
 
@@ -148,7 +194,7 @@ class InlineExport(Expr):
     pos: Pos = DEFAULT_POS
 
 
-@dataclass
+@dataclass(slots=True)
 class Lambda(Expr):
     """
     Lambda function/closure.
@@ -157,14 +203,22 @@ class Lambda(Expr):
         arg_names: Parameter names, may include rest parameter prefixed with "..."
         body: The function body expression
         curry: Captured environment for lazy evaluation
-        tree: Serialized parse tree for code reconstruction
+        tree: Parse tree of the source, for code reconstruction
+        code: Compiled bytecode of the body, shared by all closures of this lambda
+        free_vars: Names the body uses without binding them, see `free_variables`
+        params: Parameter names and index of the rest parameter, see `parameters`
     """
 
     arg_names: list[str]
     body: Expr
     pos: Pos = DEFAULT_POS
     curry: dict[str, Expr] = field(default_factory=lambda: {}, repr=False)
-    tree: bytes = field(default_factory=lambda: b"", repr=False)
+    tree: Tree | None = field(default=None, repr=False)
+    code: Any = field(default=None, repr=False, compare=False)
+    free_vars: frozenset[str] | None = field(default=None, repr=False, compare=False)
+    params: tuple[tuple[str, ...], int | None] | None = field(
+        default=None, repr=False, compare=False
+    )
 
     def __repr__(self):
         fields = [f"arg_names={self.arg_names!r}", f"body={self.body!r}"]
@@ -180,42 +234,92 @@ class Lambda(Expr):
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Constant(Expr):
     name: str
     value: Expr
     pos: Pos = DEFAULT_POS
 
 
-@dataclass
+@dataclass(slots=True)
 class Delete(Expr):
     name: str
     pos: Pos = DEFAULT_POS
 
 
-@dataclass
+@dataclass(slots=True)
 class Conditional(Expr):
     test: Expr
     then_body: Expr
     else_body: Expr
     pos: Pos = DEFAULT_POS
+    code: Any = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Call(Expr):
     func: Lambda | Callable | Expr
     args: list[Expr]
     pos: Pos = DEFAULT_POS
+    code: Any = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Index(Expr):
     target: Expr
     index: Expr
     pos: Pos = DEFAULT_POS
+    code: Any = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Assertion(Expr):
     test: Expr
     pos: Pos = DEFAULT_POS
+
+
+def parameters(node: Lambda) -> tuple[tuple[str, ...], int | None]:
+    """
+    Return the parameter names of a lambda with the "..." of a rest parameter
+    removed, and the index of the rest parameter if there is one. The result
+    is cached on the node.
+    """
+    if node.params is None:
+        node.params = (
+            tuple(name.lstrip(".") for name in node.arg_names),
+            next(
+                (i for i, name in enumerate(node.arg_names) if name.startswith("...")),
+                None,
+            ),
+        )
+    return node.params
+
+
+def free_variables(node) -> frozenset[str]:
+    """
+    Collect the names an expression refers to without binding them itself.
+    The result for a lambda is cached on the node.
+    """
+    match node:
+        case Variable():
+            return frozenset((node.name,))
+        case Lambda():
+            if node.free_vars is None:
+                params = {name.lstrip(".") for name in node.arg_names}
+                node.free_vars = free_variables(node.body) - params
+            return node.free_vars
+        case Call():
+            return free_variables(node.func).union(*map(free_variables, node.args))
+        case Conditional():
+            return (
+                free_variables(node.test)
+                | free_variables(node.then_body)
+                | free_variables(node.else_body)
+            )
+        case Index():
+            return free_variables(node.target) | free_variables(node.index)
+        case List():
+            return frozenset().union(*map(free_variables, node.elements))
+        case Spread() | PrintOutput():
+            return free_variables(node.expr)
+    return frozenset()
@@ -6,21 +6,28 @@ available in NumFu programs. Functions are implemented as type-safe overloaded
 operations that can handle multiple argument types.
 """
 
+import atexit
+import math
 import operator
+import pickle
 import random
-import re
 import sys
 import time
-from dataclasses import dataclass
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from typing import Any
 
 import mpmath as mpm
+from mpmath.libmp import to_str
 
-from .ast_types import Call, Lambda, List, PrintOutput, Variable
+from .ast_types import Call, Lambda, List, Number, PrintOutput, Variable
 from .reconstruct import reconstruct
 from .typechecks import BuiltinFunc, HelpMsg, InfiniteOf, ListOf, Validators
 
 Num = mpm.mpf
+MPF = mpm._ctx_mp._mpf
 mpm.e.name = "e"
 
 
@@ -40,9 +47,22 @@ def overload(name, eval_lists: bool = False, help: HelpMsg = HelpMsg()):
 
 
 def to_string(x, precision):
-    if isinstance(x, mpm._ctx_mp._mpf):
-        return str(mpm.nstr(x, n=precision)).removesuffix(".0")  # type: ignore
-    elif isinstance(x, bool):
+    # numbers are almost always plain mpf, constants like pi are subclasses
+    typ = type(x)
+    if typ is Num:
+        # integers that nstr would print in full are converted without it
+        sign, man, exp, _ = x._mpf_
+        if man and exp >= 0:
+            if (n := man << exp) < 10**precision:
+                return "-" + str(n) if sign else str(n)
+        elif not man and not exp:
+            return "0"
+    if typ is str:
+        return x
+    if typ is Num or isinstance(x, MPF):
+        # what mpm.nstr does for real numbers, without its type checks
+        return to_str(x._mpf_, precision).removesuffix(".0")
+    elif typ is bool:
         return "true" if x else "false"
     elif isinstance(x, Lambda):
         return reconstruct(x, precision=precision, env=x.curry)
@@ -50,22 +70,340 @@ def to_string(x, precision):
         return str(x)
 
 
+# Shared instances of the small integers lengths, counts and rounding produce.
+# They fit in 7 bits, so they are exact at any precision of at least one digit.
+_SMALL_INTEGERS = [Num(i) for i in range(-16, 129)]
+
+
+def integer(n: int):
+    """Return `n` as a number, reusing a shared instance for small values"""
+    return _SMALL_INTEGERS[n + 16] if -16 <= n <= 128 else Num(n)
+
+
+def to_number(x):
+    if isinstance(x, str) and x[:1] in ("+", "-"):
+        # resolve sign chains like "--5"
+        body = x.lstrip("+-")
+        negative = x.count("-", 0, len(x) - len(body)) % 2
+        x = ("-" if negative else "") + body
+    return Num(x)
+
+
+# Mapping a math function over at least this many numbers at a precision above
+# PARALLEL_PREC bits is split across worker processes
+PARALLEL_SIZE = 64
+PARALLEL_PREC = 128
+
+# set only while an interpreter that enabled it is running
+_workers = 1
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+
+
+@contextmanager
+def parallel(workers: int):
+    """
+    Split maps of math functions over large lists at high precision across
+    `workers` processes inside the block. With one worker everything runs in
+    the current process.
+    """
+    global _workers
+    previous, _workers = _workers, workers
+    try:
+        yield
+    finally:
+        _workers = previous
+
+
+def _map_chunk(name: str, values: list, prec: int) -> list:
+    mpm.mp.prec = prec
+    impl = getattr(Math, name).direct(values[0])
+    return [impl(v) for v in values]
+
+
+def parallel_map(f: BuiltinFunc, values: list) -> list | None:
+    """
+    Apply a function from the math module to numbers in worker processes.
+
+    Returns:
+        The results, or None if `f` is not a math function or the workers failed
+    """
+    global _pool, _pool_workers
+    name = next((k for k, v in vars(Math).items() if v is f), None)
+    if name is None or _workers < 2:
+        return None
+
+    size = -(-len(values) // _workers)
+    chunks = [values[i : i + size] for i in range(0, len(values), size)]
+    try:
+        if _pool is None or _pool_workers != _workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool, _pool_workers = ProcessPoolExecutor(_workers), _workers
+            atexit.register(_pool.shutdown)
+        results = _pool.map(
+            _map_chunk, [name] * len(chunks), chunks, [mpm.mp.prec] * len(chunks)
+        )
+        return [v for chunk in results for v in chunk]
+    except BrokenProcessPool:
+        # a worker died, the next call starts a new pool
+        _pool.shutdown(wait=False)  # type: ignore
+        _pool = None
+        return None
+    except (OSError, pickle.PicklingError):
+        # processes cannot be started here, the caller maps serially
+        return None
+
+
+# lists at least this long are mapped with a compiled lambda if possible
+JIT_SIZE = 16
+
+
+def map_native(lst, f: Lambda) -> list | None:
+    """
+    Apply a lambda to numbers through a function compiled by `jit`. The body
+    must only combine its parameter and literals with operators, so it has
+    no side effects and the results can be computed before they are used.
+
+    Returns:
+        The results, or None if the lambda cannot be compiled or any element
+        is not a real number or does not give one
+    """
+    from .jit import Deopt, jit  # the JIT compiler imports this module
+
+    if len(f.arg_names) != 1 or not all(
+        isinstance(e, (Num, Number)) for e in lst.elements
+    ):
+        return None
+
+    # the function is kept with the bytecode, like for calls of the lambda.
+    # Functions calling math functions have guards that can only be checked
+    # by the interpreter, and the body would not compile here anyway.
+    code = f.code if f.code is not None and f.code.prec == mpm.mp.prec else None
+    native = code.native if code is not None else None
+    if native is None:
+        if (native := jit(f, BUILTINS)) is None:
+            return None
+        if code is not None:
+            code.native = native
+    elif not native or native.guards or native.params != f.arg_names:
+        return None
+
+    try:
+        results = [native(e.mpf if isinstance(e, Number) else e) for e in lst.elements]
+    except (Deopt, ZeroDivisionError, ValueError):
+        # the interpreter evaluates the elements again and reports any error
+        return None
+    # booleans in a list would be evaluated as numbers
+    return results if all(type(r) is Num for r in results) else None
+
+
+def map_list(lst, f):
+    if isinstance(f, BuiltinFunc) and all(
+        isinstance(e, (Num, Number)) for e in lst.elements
+    ):
+        # numbers can be passed straight to the implementation of a simple builtin
+        values = [e.mpf if isinstance(e, Number) else e for e in lst.elements]
+        if values and (impl := f.direct(values[0])) is not None:
+            results = None
+            if len(values) >= PARALLEL_SIZE and mpm.mp.prec > PARALLEL_PREC:
+                results = parallel_map(f, values)
+            if results is None:
+                results = [impl(v) for v in values]
+            # complex results and booleans are converted by the interpreter
+            if all(type(r) is Num for r in results):
+                return List(results, pos=lst.pos, curry=lst.curry)
+
+    if isinstance(f, Lambda):
+        if len(lst.elements) >= JIT_SIZE and (results := map_native(lst, f)):
+            return List(results, pos=lst.pos, curry=lst.curry)
+        calls = [Call(f, [element], pos=f.pos) for element in lst.elements]
+    else:
+        func = f if f.partial else Variable.intern(f.name)
+        calls = [
+            Call(func, [element], pos=getattr(element, "pos", None))  # type: ignore
+            for element in lst.elements
+        ]
+    return List(calls, pos=lst.pos, curry=lst.curry)
+
+
+# One period of sine for the optional table-based trigonometry. The size is a
+# power of two so that indices wrap around with a mask.
+_LUT_SIZE = 4096
+_LUT_MASK = _LUT_SIZE - 1
+_LUT_STEP = _LUT_SIZE / (2 * math.pi)
+_SIN_LUT = array("d", [math.sin(i / _LUT_STEP) for i in range(_LUT_SIZE)])
+
+# set only while an interpreter that enabled it is running
+_fast_trig = False
+
+
+@contextmanager
+def fast_trig(enabled: bool):
+    """
+    Compute sin, cos and tan by interpolating in a lookup table inside the
+    block, while the precision is at most 53 bits. Results are accurate to
+    about 7 digits.
+    """
+    global _fast_trig
+    previous, _fast_trig = _fast_trig, enabled
+    try:
+        yield
+    finally:
+        _fast_trig = previous
+
+
+def lut_sin(x: float, shift: int = 0) -> float:
+    """Sine of `x` interpolated from the table, `shift` is in table steps"""
+    i = (x % (2 * math.pi)) * _LUT_STEP
+    i0 = int(i)
+    low = _SIN_LUT[(i0 + shift) & _LUT_MASK]
+    return low + (i - i0) * (_SIN_LUT[(i0 + shift + 1) & _LUT_MASK] - low)
+
+
+def lut_cos(x: float) -> float:
+    return lut_sin(x, _LUT_SIZE // 4)
+
+
+def lut_tan(x: float) -> float:
+    cos = lut_cos(x)
+    return lut_sin(x) / cos if cos else math.inf
+
+
+def memoize(func, size: int = 4096, binary: bool = False):
+    """
+    Cache the results of a unary or `binary` mpmath function by arguments and
+    precision. The oldest entry is dropped once `size` results are stored.
+    """
+    cache = {}
+
+    def store(key, value):
+        cache[key] = value
+        if len(cache) > size:
+            del cache[next(iter(cache))]
+        return value
+
+    def unary_impl(x):
+        key = (x._mpf_, mpm.mp.prec)
+        if (value := cache.get(key)) is None:
+            value = store(key, func(x))
+        return value
+
+    def binary_impl(x, y):
+        key = (x._mpf_, y._mpf_, mpm.mp.prec)
+        if (value := cache.get(key)) is None:
+            value = store(key, func(x, y))
+        return value
+
+    impl = binary_impl if binary else unary_impl
+    impl.__name__ = func.__name__
+    return impl
+
+
+def trig(exact, fast):
+    """Wrap an mpmath function to use the table-based `fast` when enabled"""
+
+    def impl(x):
+        if _fast_trig and mpm.mp.prec <= 53 and mpm.isfinite(x):
+            return Num(fast(float(x)))
+        return exact(x)
+
+    impl.__name__ = exact.__name__
+    return impl
+
+
+def _exact_double(x) -> bool:
+    """Whether a float holds the value of an mpf exactly"""
+    _, man, exp, bc = x._mpf_
+    # zero, infinities and nan have no mantissa and convert exactly
+    return not man or (bc <= 53 and exp >= -1074 and exp + bc <= 1024)
+
+
+# integer sort keys are only used if they are at most this long
+SORT_KEY_BITS = 1 << 16
+
+
+def _integer_keys(elements: list) -> list | None:
+    """
+    Scale finite numbers by a common power of two into integers that compare
+    like them. Returns None for other elements or if the integers would get
+    longer than `SORT_KEY_BITS`.
+    """
+    if not all(type(e) is Num for e in elements):
+        return None
+    values = [e._mpf_ for e in elements]
+    # infinities and nan have no mantissa either, but a nonzero exponent
+    if any(not man and exp for _, man, exp, _ in values):
+        return None
+    exps = [exp for _, man, exp, _ in values if man]
+    if not exps:
+        return [0] * len(values)
+    low = min(exps)
+    if max(exp + bc for _, man, exp, bc in values if man) - low > SORT_KEY_BITS:
+        return None
+    return [
+        -man << exp - low if sign else man << exp - low for sign, man, exp, _ in values
+    ]
+
+
+def sort_list(lst):
+    if all(type(e) is Num and _exact_double(e) for e in lst.elements):
+        # converted to floats, numbers compare the same but much faster
+        return List(sorted(lst.elements, key=float), pos=lst.pos, curry=lst.curry)
+    if (keys := _integer_keys(lst.elements)) is not None:
+        # integers compare in C instead of through mpf.__lt__
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return List([lst.elements[i] for i in order], pos=lst.pos, curry=lst.curry)
+    return List(sorted(lst.elements), pos=lst.pos, curry=lst.curry)
+
+
+def extremum(pick):
+    """
+    Wrap `max` or `min` for a list of numbers to compare float or integer
+    keys instead of mpf objects, like `sort_list`
+    """
+
+    def impl(values):
+        if all(type(v) is Num and _exact_double(v) for v in values):
+            return pick(values, key=float)
+        if (keys := _integer_keys(values)) is not None:
+            return values[pick(range(len(keys)), key=keys.__getitem__)]
+        return pick(values)
+
+    return impl
+
+
+_NAN = mpm.mpf("nan")
+_INF = mpm.mpf("inf")
+_NINF = mpm.mpf("-inf")
+
+
 def division(a, b):
     """
     Safe division that handles division by zero according to IEEE 754.
     """
+    # a try block costs nothing until it raises, unlike testing `b` first
     try:
-        return mpm.fdiv(a, b)
+        return a / b
     except ZeroDivisionError:
         if a == 0:
-            return mpm.mpf("nan")
+            return _NAN
         elif a > 0:
-            return mpm.mpf("inf")
+            return _INF
         else:
-            return mpm.mpf("-inf")
+            return _NINF
+
+
+def modulo(a, b):
+    """
+    Remainder that is NaN for a zero divisor, like fmod in IEEE 754.
+    """
+    try:
+        return a % b
+    except ZeroDivisionError:
+        return _NAN
 
 
-@dataclass(frozen=True)
 class Builtins:
     nan = mpm.nan
     inf = mpm.inf
@@ -97,7 +435,6 @@ class Builtins:
     _exit = overload("exit")
 
 
-@dataclass(frozen=True)
 class Math:
     pi = mpm.pi
     e = mpm.e
@@ -136,7 +473,6 @@ class Math:
     _degrees = overload("degrees")
 
 
-@dataclass(frozen=True)
 class Types:
     _isnan = overload("isnan")
     _isinf = overload("isinf")
@@ -147,7 +483,6 @@ class Types:
     _string = overload("String")
 
 
-@dataclass(frozen=True)
 class Std:
     _append = overload("append")
     _length = overload("length")
@@ -169,32 +504,32 @@ class Std:
     _range = overload("range")
 
 
-@dataclass(frozen=True)
 class Io:
     _print = overload("print")
     _println = overload("println")
     _input = overload("input")
 
 
-@dataclass(frozen=True)
 class Random:
     _random = overload("random")
     _seed = overload("seed")
 
 
-@dataclass(frozen=True)
 class System:
     _time = overload("time")
 
 
 # Register overloads
-Builtins._add.add([Num, Num], Num, mpm.fadd).add([str, str], str, operator.add).add(
+# Arithmetic on two mpf values goes through their operator methods, which round
+# to the current precision just like mpm.fadd & co. but skip the argument
+# conversion those generic context functions do on every call.
+Builtins._add.add([Num, Num], Num, operator.add).add([str, str], str, operator.add).add(
     [List, List],
     List,
     lambda a, b: List(a.elements + b.elements, pos=a.pos, curry=a.curry | b.curry),
 )
-Builtins._sub.add([Num], Num, lambda a: mpm.fsub(0, a)).add([Num, Num], Num, mpm.fsub)
-Builtins._mul.add([Num, Num], Num, mpm.fmul).add(
+Builtins._sub.add([Num], Num, operator.neg).add([Num, Num], Num, operator.sub)
+Builtins._mul.add([Num, Num], Num, operator.mul).add(
     [str, Num],
     str,
     lambda a, b: a * int(b),
@@ -210,8 +545,8 @@ Builtins._mul.add([Num, Num], Num, mpm.fmul).add(
     [List, List], "Cannot multiply two lists"
 )
 Builtins._div.add([Num, Num], Num, division)
-Builtins._mod.add([Num, Num], Num, mpm.fmod)
-Builtins._pow.add([Num, Num], Num, mpm.power)
+Builtins._mod.add([Num, Num], Num, modulo)
+Builtins._pow.add([Num, Num], Num, operator.pow)
 
 Builtins._and.add([Any, Any], bool, lambda a, b: bool(a) and bool(b))
 Builtins._or.add([Any, Any], bool, lambda a, b: bool(a) or bool(b))
@@ -231,40 +566,40 @@ Builtins._lt.add([Num, Num], bool, operator.lt)
 Builtins._ge.add([Num, Num], bool, operator.ge)
 Builtins._le.add([Num, Num], bool, operator.le)
 
-Math.sin.add([Num], Num, mpm.sin)
-Math.cos.add([Num], Num, mpm.cos)
-Math.tan.add([Num], Num, mpm.tan)
-Math.asin.add([Num], Num, mpm.asin)
-Math.acos.add([Num], Num, mpm.acos)
-Math.atan.add([Num], Num, mpm.atan)
-Math.atan2.add([Num, Num], Num, mpm.atan2)
-
-Math.sinh.add([Num], Num, mpm.sinh)
-Math.cosh.add([Num], Num, mpm.cosh)
-Math.tanh.add([Num], Num, mpm.tanh)
+Math.sin.add([Num], Num, trig(memoize(mpm.sin), lut_sin))
+Math.cos.add([Num], Num, trig(memoize(mpm.cos), lut_cos))
+Math.tan.add([Num], Num, trig(memoize(mpm.tan), lut_tan))
+Math.asin.add([Num], Num, memoize(mpm.asin))
+Math.acos.add([Num], Num, memoize(mpm.acos))
+Math.atan.add([Num], Num, memoize(mpm.atan))
+Math.atan2.add([Num, Num], Num, memoize(mpm.atan2, binary=True))
+
+Math.sinh.add([Num], Num, memoize(mpm.sinh))
+Math.cosh.add([Num], Num, memoize(mpm.cosh))
+Math.tanh.add([Num], Num, memoize(mpm.tanh))
 Math.asinh.add([Num], Num, mpm.asinh)
 Math.acosh.add([Num], Num, mpm.acosh)
 Math.atanh.add([Num], Num, mpm.atanh)
 
-Math.exp.add([Num], Num, mpm.exp)
-Math.log.add([Num, Num], Num, mpm.log)
-Math.log10.add([Num], Num, mpm.log10)
-Math.sqrt.add([Num], Num, mpm.sqrt)
+Math.exp.add([Num], Num, memoize(mpm.exp))
+Math.log.add([Num, Num], Num, memoize(mpm.log, binary=True))
+Math.log10.add([Num], Num, memoize(mpm.log10))
+Math.sqrt.add([Num], Num, memoize(mpm.sqrt))
 Math._max.add([InfiniteOf(Num)], Num, max).add(
     [ListOf(Num)],
     Num,
-    max,
+    extremum(max),
     transformer=lambda x: [x.elements],
     help=HelpMsg(invalid_arg="Only numbers are supported"),
 )
 Math._min.add([InfiniteOf(Num)], Num, min).add(
     [ListOf(Num)],
     Num,
-    min,
+    extremum(min),
     transformer=lambda x: [x.elements],
     help=HelpMsg(invalid_arg="Only numbers are supported"),
 )
-Math._sum.add([ListOf(Num)], Num, sum)
+Math._sum.add([ListOf(Num)], Num, mpm.fsum)
 
 Math._radians.add([Num], Num, mpm.radians)
 Math._degrees.add([Num], Num, mpm.degrees)
@@ -274,7 +609,7 @@ Types._isinf.add([Num], bool, mpm.isinf)
 
 Math._ceil.add([Num], Num, mpm.ceil)
 Math._floor.add([Num], Num, mpm.floor)
-Math._round.add([Num], Num, lambda x: Num(round(x))).add(
+Math._round.add([Num], Num, lambda x: integer(round(x))).add(
     [Num, Num],
     Num,
     lambda x, p: Num(round(x, int(p)), validators=[None, Validators.is_integer]),
@@ -286,15 +621,7 @@ Types._bool.add([Any], bool, lambda a: bool(a))
 Types._number.add(
     [bool | Num | str],
     Num,
-    lambda x: Num(
-        re.sub(
-            r"^(\+|-)*",
-            "" if x.split("e")[0].split("E")[0].count("-") % 2 == 0 else "-",
-            x,
-        )  # resolve sign chains
-        if isinstance(x, str)
-        else x
-    ),
+    to_number,
     validators=[Validators.is_number],
 )
 Types._list.add([Any], List, lambda a: List(a), validators=[Validators.is_iterable])
@@ -304,7 +631,7 @@ Types._string.add([Any], str, to_string)
 Std._append.add(
     [List, Any], List, lambda a, b: List(a.elements + [b], pos=a.pos, curry=a.curry)
 )
-Std._length.add([List | str], Num, lambda a: Num(len(a)))
+Std._length.add([List | str], Num, lambda a: integer(len(a)))
 Std._contains.add([List, Any], bool, lambda a, b: b in a).add(
     [str, str], bool, lambda a, b: b in a
 )
@@ -329,7 +656,7 @@ Std._reverse.add(
 Std._sort.add(
     [List],
     List,
-    lambda a: List(sorted(a.elements), pos=a.pos, curry=a.curry),
+    sort_list,
 ).add(
     [str],
     str,
@@ -358,29 +685,12 @@ Std._format.add(
     ),
 )
 Std._trim.add([str], str, lambda s: s.strip())
-Std._toLowerCase.add([str], str, lambda s: s.lower())
-Std._toUpperCase.add([str], str, lambda s: s.upper())
+Std._toLowerCase.add([str], str, str.lower)
+Std._toUpperCase.add([str], str, str.upper)
 Std._replace.add([str, str, str], str, lambda a, b, c: a.replace(b, c))
-Std._count.add([str, str], Num, lambda a, b: Num(a.count(b)))
+Std._count.add([str, str], Num, lambda a, b: integer(a.count(b)))
 
-Builtins._map.add(
-    [List, Lambda | BuiltinFunc],
-    List,
-    lambda lst, f: List(
-        [
-            Call(f, [element], pos=f.pos)
-            if isinstance(f, Lambda)
-            else Call(
-                Variable(f.name) if not f.partial else f,
-                [element],
-                pos=getattr(element, "pos", None),  # type: ignore
-            )
-            for element in lst.elements
-        ],
-        pos=lst.pos,
-        curry=lst.curry,
-    ),
-)
+Builtins._map.add([List, Lambda | BuiltinFunc], List, map_list)
 Builtins._filter.add(
     [List, Lambda | BuiltinFunc],
     List,
@@ -420,3 +730,10 @@ Builtins._error.add([str], None, lambda x: None).add([str, str], None, lambda x:
 Builtins._assert.add([bool], Any, lambda x: None).add([bool, Any], Any, lambda x: None)
 Builtins._exit.add([], None, sys.exit)
 System._time.add([], Num, lambda: Num(time.time()))
+
+# builtins by the name programs use for them, shared by all interpreters
+BUILTINS: dict[str, Any] = {
+    getattr(v, "name", name): v
+    for name, v in vars(Builtins).items()
+    if not name.startswith("__")
+}
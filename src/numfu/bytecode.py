@@ -0,0 +1,224 @@
+"""
+Bytecode Compiler for NumFu
+
+Lowers AST expressions into a flat sequence of opcodes so the interpreter
+can evaluate them in a single dispatch loop instead of recursing into
+`Interpreter._eval` for every node. Nodes that need the full tree-walking
+machinery (lists, spreads, prints, ...) are embedded as EVAL instructions.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any
+
+import mpmath
+
+from .ast_types import (
+    Bool,
+    Call,
+    Conditional,
+    Expr,
+    Index,
+    Lambda,
+    Number,
+    Spread,
+    String,
+    Variable,
+)
+from .builtins import BUILTINS
+from .typechecks import OPERATORS
+
+
+def is_pure(node) -> bool:
+    """
+    Whether `node` is an operator applied to literals only, e.g. `-1` or
+    `2 * 3`. Such expressions evaluate to the same value every time.
+    """
+    match node:
+        case Number() | String() | Bool():
+            return True
+        case Call(func=Variable(name=name)):
+            return (
+                name in OPERATORS
+                and name not in ("&&", "||")
+                and all(is_pure(arg) for arg in node.args)
+            )
+    return False
+
+
+class Op(IntEnum):
+    LOAD_CONST = 0
+    LOAD_NAME = 1
+    MAKE_LAMBDA = 2
+    ENTER_CALL = 3
+    CALL = 4
+    TAIL_CALL = 5
+    CALL_SPREAD = 6
+    TAIL_CALL_SPREAD = 7
+    JMP_IF_FALSE = 8
+    JMP_IF_TRUE = 9
+    JMP = 10
+    TO_BOOL = 11
+    INDEX = 12
+    EVAL = 13
+    TAIL_EVAL = 14
+    RETURN = 15
+    LOAD_PURE = 16
+    LOAD_LOCAL = 17
+    CALL_OPERATOR = 18
+
+
+@dataclass
+class Code:
+    """
+    Args:
+        code: Flat sequence of (opcode, argument) pairs
+        consts: Constant pool holding literals and the nodes referenced by instructions
+        names: Variable nodes referenced by LOAD_NAME
+        params: Parameter names of the lambda whose body this is, read by LOAD_LOCAL
+        prec: mpmath precision the numeric literals were converted with
+        cache: Builtin each name resolved to, per LOAD_NAME site, with the lookup key
+        threaded: `code` with opcodes replaced by handlers, built by the interpreter
+        calls: Number of lambda calls that ran this code, counted until JIT compilation
+        native: JIT-compiled function, or False if the code cannot be compiled
+        memo: Results of the lambda by arguments, or False if it is not memoized
+    """
+
+    code: array
+    consts: list[Any] = field(default_factory=list)
+    names: list[Variable] = field(default_factory=list)
+    params: tuple[str, ...] = ()
+    prec: int = 53
+    cache: list[Any] = field(default_factory=list, repr=False)
+    threaded: list[Any] | None = field(default=None, repr=False)
+    calls: int = field(default=0, repr=False)
+    native: Any = field(default=None, repr=False)
+    memo: Any = field(default=None, repr=False)
+
+    def __post_init__(self):
+        self.cache = [None] * len(self.names)
+
+    def __repr__(self):
+        ops = [
+            f"{Op(self.code[i]).name} {self.code[i + 1]}"
+            for i in range(0, len(self.code), 2)
+        ]
+        return f"Code({', '.join(ops)})"
+
+
+class Compiler:
+    def __init__(self, params: tuple[str, ...] = ()):
+        self.code = array("I")
+        self.consts: list[Any] = []
+        self.names: list[Variable] = []
+        # a repeated parameter name is bound to the last argument passed for it
+        self.slots = {name: i for i, name in enumerate(params)}
+
+    def emit(self, op: Op, arg: int = 0) -> int:
+        self.code.extend((op, arg))
+        return len(self.code) - 1
+
+    def patch(self, at: int):
+        # point the jump whose argument lives at `at` to the current end of code
+        self.code[at] = len(self.code)
+
+    def const(self, value) -> int:
+        self.consts.append(value)
+        return len(self.consts) - 1
+
+    def expr(self, node, tail: bool = False, root: bool = False):
+        """
+        Emit the instructions for `node`, leaving its value on the stack.
+
+        Nested nodes carrying a top-level index change the interpreter state
+        when evaluated, so they are delegated to the tree walker.
+        """
+        if not root and getattr(getattr(node, "pos", None), "index", None) is not None:
+            self.emit(Op.TAIL_EVAL if tail else Op.EVAL, self.const(node))
+            return
+
+        match node:
+            case Number():
+                self.emit(Op.LOAD_CONST, self.const(node.mpf))
+            case String() | Bool():
+                self.emit(Op.LOAD_CONST, self.const(node.value))
+            case Variable() if node.name in self.slots:
+                self.emit(Op.LOAD_LOCAL, self.slots[node.name])
+            case Variable():
+                self.names.append(node)
+                self.emit(Op.LOAD_NAME, len(self.names) - 1)
+            case Lambda():
+                self.emit(Op.MAKE_LAMBDA, self.const(node))
+            case Conditional():
+                self.expr(node.test)
+                to_else = self.emit(Op.JMP_IF_FALSE)
+                self.expr(node.then_body, tail=tail)
+                to_end = self.emit(Op.JMP)
+                self.patch(to_else)
+                self.expr(node.else_body, tail=tail)
+                self.patch(to_end)
+            case Index():
+                self.expr(node.target)
+                self.expr(node.index)
+                self.emit(Op.INDEX, self.const(node))
+            case Call() if is_pure(node):
+                # evaluated once, then replaced by its value in the constant pool
+                self.emit(Op.LOAD_PURE, self.const(node))
+            case Call():
+                self.call(node, tail)
+            case float() | int() | mpmath.mpf():
+                self.emit(Op.LOAD_CONST, self.const(mpmath.mpf(node)))
+            case str():
+                self.emit(Op.LOAD_CONST, self.const(node))
+            case None:
+                self.emit(Op.LOAD_CONST, self.const(mpmath.mpf(0)))
+            case _ if not isinstance(node, Expr) and type(node).__name__ == "constant":
+                self.emit(Op.LOAD_CONST, self.const(node))
+            case _:
+                self.emit(Op.TAIL_EVAL if tail else Op.EVAL, self.const(node))
+
+    def call(self, node: Call, tail: bool):
+        if isinstance(node.func, Variable) and node.func.name in ("&&", "||"):
+            # short-circuiting: the right operand is only evaluated if needed
+            self.expr(node.args[0])
+            skip = self.emit(
+                Op.JMP_IF_FALSE if node.func.name == "&&" else Op.JMP_IF_TRUE
+            )
+            self.expr(node.args[1])
+            self.emit(Op.TO_BOOL)
+            to_end = self.emit(Op.JMP)
+            self.patch(skip)
+            self.emit(Op.LOAD_CONST, self.const(node.func.name == "||"))
+            self.patch(to_end)
+        elif any(isinstance(arg, Spread) for arg in node.args):
+            self.emit(Op.TAIL_CALL_SPREAD if tail else Op.CALL_SPREAD, self.const(node))
+        elif isinstance(node.func, Variable) and node.func.name in OPERATORS:
+            # operators cannot be shadowed, so the builtin is bound right away
+            for arg in node.args:
+                self.expr(arg)
+            self.emit(Op.CALL_OPERATOR, self.const((node, BUILTINS[node.func.name])))
+        else:
+            self.expr(node.func)
+            self.emit(Op.ENTER_CALL)
+            for arg in node.args:
+                self.expr(arg)
+            self.emit(Op.TAIL_CALL if tail else Op.CALL, self.const(node))
+
+
+def compile_expr(node, root: bool = True, params: tuple[str, ...] = ()) -> Code:
+    """
+    Compile an expression into a `Code` object.
+
+    Args:
+        node: Expression to compile
+        root: Whether the caller has already applied the node's top-level index
+        params: Names resolved to argument slots instead of environment lookups
+
+    Returns:
+        Code object whose instructions evaluate `node` in tail position
+    """
+    compiler = Compiler(params)
+    compiler.expr(node, tail=True, root=root)
+    compiler.emit(Op.RETURN)
+    return Code(compiler.code, compiler.consts, compiler.names, params, mpmath.mp.prec)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field, replace
+from functools import cached_property
 from typing import Any
 
 from .ast_types import (
@@ -17,6 +18,11 @@ class Module:
     globals: dict[str, Any] = field(default_factory=lambda: {})
     depth: int = field(default_factory=lambda: 0)
 
+    @cached_property
+    def source(self) -> str:
+        """Source code of the module, decoded on first access"""
+        return self.code.decode("utf-8")
+
 
 @dataclass
 class State:
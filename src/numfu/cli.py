@@ -1,5 +1,4 @@
 import os
-import pickle
 import platform
 from pathlib import Path
 from typing import List, Optional
@@ -7,18 +6,17 @@ from typing import List, Optional
 import click
 
 from ._version import __version__
-from .interpreter import Interpreter
-from .parser import Parser
-from .repl import REPL
+
+# The parser, interpreter and REPL (and pickle) are imported by the commands
+# using them, so that --help and --version do not load Lark, mpmath and rich.
 
 
 class DefaultGroup(click.Group):
     def resolve_command(self, ctx: click.Context, args: List[str]):
-        if args and args[0] in self.commands:
-            cmd_name = args[0]
-            cmd = self.commands[cmd_name]
-            return cmd_name, cmd, args[1:]
         if args:
+            cmd = self.commands.get(args[0])
+            if cmd is not None:
+                return args[0], cmd, args[1:]
             return "_default", self.commands["_default"], args
         return None, None, []
 
@@ -39,7 +37,10 @@ def cli(ctx: click.Context) -> None:
     name="_default",
     context_settings=dict(ignore_unknown_options=False, allow_interspersed_args=True),
 )
-@click.argument("source", type=click.Path(exists=True, dir_okay=False, readable=True))
+@click.argument(
+    "source",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+)
 @click.option(
     "-p",
     "--precision",
@@ -63,20 +64,54 @@ def cli(ctx: click.Context) -> None:
     type=int,
     help="Maximum iterations of tail-call optimized recursion during evaluation.",
 )
+@click.option(
+    "--fast-trig",
+    is_flag=True,
+    default=False,
+    help="Use table-based sin, cos and tan (about 7 digits) at precision 15 or lower.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Processes used to map math functions over large lists at high precision.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    show_default=True,
+    help="Reuse the syntax tree cached by an earlier run of the same code.",
+)
 @click.pass_context
 def default(
     ctx: click.Context,
-    source: str,
+    source: Path,
     precision: int,
     rec_depth: int,
     iter_depth: int,
+    fast_trig: bool,
+    workers: int,
+    cache: bool,
 ) -> None:
     """Parse and run a NumFu source file."""
-    run_file(source, precision, rec_depth, iter_depth)
+    run_file(
+        source,
+        precision,
+        rec_depth,
+        iter_depth,
+        fast_trig,
+        workers=workers,
+        cache=cache,
+    )
 
 
 @cli.command()
-@click.argument("source", type=click.Path(exists=True, dir_okay=False, readable=True))
+@click.argument(
+    "source",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+)
 @click.option(
     "-p",
     is_flag=True,
@@ -107,27 +142,30 @@ def default(
     help="Indentation size for AST pretty print.",
 )
 def parse(
-    source: str,
+    source: Path,
     p: bool,
     output: Optional[str],
     max_depth: int,
     indent: int,
 ) -> None:
     """Parse the input file and serialize or pretty print it"""
-    source_path = Path(source)
-    code = source_path.read_text()
+    from .parser import Parser
+
+    code = source.read_text()
     parser = Parser(fatal=True)
-    repl = REPL(max_depth=max_depth, indent=indent)
+    tree = parser.parse(code, source)
 
-    tree, _ = repl.print_ast(parser.parse(code, source_path), actually_print=p)
+    if p:
+        from .repl import REPL
 
-    if not p:
+        REPL(max_depth=max_depth, indent=indent).print_ast(tree)
+    else:
         if not output:
-            output_path = Path(source.removesuffix(".nfu") + ".nfut")
+            output_path = source.with_name(source.name.removesuffix(".nfu") + ".nfut")
         else:
-            output_path = Path(source)
+            output_path = Path(output)
         try:
-            output_path.write_bytes(b"NFU-TREE-FILE" + pickle.dumps(tree))
+            write_tree(output_path, tree)
             click.echo(f"Parsed file saved to {output_path}")
         except Exception as e:
             click.echo(f"Error saving parsed file: {e}")
@@ -157,21 +195,43 @@ def parse(
     type=int,
     help="Maximum iterations of tail-call optimized recursion during evaluation.",
 )
+@click.option(
+    "--fast-trig",
+    is_flag=True,
+    default=False,
+    help="Use table-based sin, cos and tan (about 7 digits) at precision 15 or lower.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Processes used to map math functions over large lists at high precision.",
+)
 @click.pass_context
 def repl(
     ctx: click.Context,
     precision: int,
     rec_depth: int,
     iter_depth: int,
+    fast_trig: bool,
+    workers: int,
 ) -> None:
     """Start an interactive REPL."""
     if ctx.invoked_subcommand is None:
+        from .interpreter import Interpreter
+        from .parser import Parser
+        from .repl import REPL
+
         parser = Parser(fatal=False)
         interpreter = Interpreter(
             precision,
             rec_depth,
             iter_depth=iter_depth,
             fatal=False,
+            fast_trig=fast_trig,
+            workers=workers,
         )
         env = {}
         modules = {}
@@ -210,6 +270,9 @@ def repl(
 )
 def repl_ast(max_depth: int, indent: int) -> None:
     """Start the interactive AST REPL."""
+    from .parser import Parser
+    from .repl import REPL
+
     repl = REPL(max_depth=max_depth, indent=indent)
     parser = Parser(fatal=False)
 
@@ -223,11 +286,109 @@ def repl_ast(max_depth: int, indent: int) -> None:
     )
 
 
-def run_file(source: str, precision: int, rec_depth: int, iter_depth: int) -> None:
-    source_path = Path(source)
+def write_tree(path: Path, tree) -> None:
+    """
+    Save a syntax tree as a .nfut file. It is written to a temporary file
+    first and then renamed, so that an interrupted write or a concurrent run
+    never leaves a truncated file behind.
+    """
+    import pickle
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(b"NFU-TREE-FILE")
+            pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def cache_path(source: bytes) -> Path:
+    """Where the syntax tree of a source file is cached, in the user cache directory"""
+    import dataclasses
+    import hashlib
+
+    from . import ast_types
+
+    # trees pickled with other node fields cannot be loaded, so the fields are
+    # part of the key as well
+    layout = " ".join(
+        f"{cls.__name__}({','.join(f.name for f in dataclasses.fields(cls))})"
+        for cls in vars(ast_types).values()
+        if isinstance(cls, type) and dataclasses.is_dataclass(cls)
+    )
+    # a changed grammar or parser may build a different tree from the same code
+    package = Path(__file__).parent
+    parser = b"".join(
+        (package / name).read_bytes()
+        for name in ("parser.py", "grammar/numfu.lark", "grammar/grammar.py")
+    )
+    key = hashlib.blake2b(
+        f"{__version__}\0{layout}\0".encode() + parser + b"\0" + source,
+        digest_size=16,
+    ).hexdigest()
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "numfu" / f"{key}.nfut"
+
+
+def parse_cached(code: str, path: Path, source: bytes):
+    """
+    Parse `code`, reusing the tree stored by an earlier run of the same code.
+    `source` is the file content `code` was decoded from, the cache is keyed
+    by it so that the code does not have to be encoded again.
+    """
+    import pickle
+
+    cached = cache_path(source)
+    try:
+        content = cached.read_bytes()
+    except OSError:
+        content = None  # missing or unreadable, the file is parsed again
+    if content is not None:
+        try:
+            if content.startswith(b"NFU-TREE-FILE"):
+                return pickle.loads(content[len(b"NFU-TREE-FILE") :])
+        # unpickling a damaged file can fail with almost any exception
+        except Exception:  # noqa: S110
+            pass
+        # truncated or written by another version, not worth reading again
+        try:
+            cached.unlink()
+        except OSError:
+            pass
+
+    from .parser import Parser
+
+    parser = Parser(fatal=True)
+    tree = parser.parse(code, path=path)
+    if tree is not None:
+        try:
+            cached.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            write_tree(cached, tree)
+        except OSError:
+            pass  # running does not depend on the cache
+    return tree
+
+
+def run_file(
+    source: Path,
+    precision: int,
+    rec_depth: int,
+    iter_depth: int,
+    fast_trig: bool = False,
+    workers: int = 1,
+    cache: bool = False,
+) -> None:
+    import pickle
+
+    from .interpreter import Interpreter
+    from .parser import Parser
+
     parsed = False
     tree = None
-    with open(source_path, "rb") as f:
+    with open(source, "rb") as f:
         if f.read(len(b"NFU-TREE-FILE")) == b"NFU-TREE-FILE":
             code = ""
             content = f.read()
@@ -236,13 +397,16 @@ def run_file(source: str, precision: int, rec_depth: int, iter_depth: int) -> No
         else:
             try:
                 f.seek(0)
-                code = f.read().decode("utf-8")
+                data = f.read()
+                code = data.decode("utf-8")
             except UnicodeDecodeError:
-                raise click.FileError(source, "unrecognized file format")
+                raise click.FileError(str(source), "unrecognized file format")
 
-    if not parsed:
+    if not parsed and cache:
+        tree = parse_cached(code, source, data)
+    elif not parsed:
         parser = Parser(fatal=True)
-        tree = parser.parse(code, path=source_path)
+        tree = parser.parse(code, path=source)
 
     if tree is None:
         return
@@ -252,5 +416,7 @@ def run_file(source: str, precision: int, rec_depth: int, iter_depth: int) -> No
         rec_depth,
         fatal=True,
         iter_depth=iter_depth,
+        fast_trig=fast_trig,
+        workers=workers,
     )
-    interpreter.run(tree, path=source_path, code=code)
+    interpreter.run(tree, path=source, code=code)
@@ -7,16 +7,35 @@ and colored terminal output.
 
 import re
 import sys
-import zlib
-
-from rich.console import Console
-from rich.markup import escape
-from rich.theme import Theme
 
 from .ast_types import Pos
 from .classes import Module
 
-console = Console(theme=Theme({"blue": "#39bae5", "red": "#ef7177"}))
+_UNEXPECTED_EXPECTED = re.compile(
+    r"Unexpected token Token\('([^']*)', '[^']*'\) at line (\d+), column (\d+)\.\nExpected one of:"
+)
+_EXPECTED = re.compile(r"\s\* (\w+)")
+# an unexpected character or token, only one of the alternatives participates
+_UNEXPECTED = re.compile(
+    r"No terminal matches '(.+)' in the current parser context, at line (\d+) col (\d+)"
+    r"|Unexpected token Token\('.+', '(.+)'\) at line (\d+), column (\d+)"
+)
+
+_console = None
+
+
+def get_console():
+    """
+    Return the console errors are printed to. rich takes long to import and
+    is only needed once an error is shown, so it is imported on first use.
+    """
+    global _console
+    if _console is None:
+        from rich.console import Console
+        from rich.theme import Theme
+
+        _console = Console(theme=Theme({"blue": "#39bae5", "red": "#ef7177"}))
+    return _console
 
 
 class CPos:
@@ -46,7 +65,11 @@ class CPos:
             self.line = code.count("\n", 0, pos.start) + 1
             self.col = pos.start - code.rfind("\n", 0, pos.start)
         if pos.end is not None:
-            self.end_line = code.count("\n", 0, pos.end) + 1
+            if pos.start is not None and pos.start <= pos.end:
+                # only the span itself needs to be scanned for more lines
+                self.end_line = self.line + code.count("\n", pos.start, pos.end)
+            else:
+                self.end_line = code.count("\n", 0, pos.end) + 1
             self.end_col = pos.end - code.rfind("\n", 0, pos.end)
         return self
 
@@ -54,14 +77,15 @@ class CPos:
         """
         Split a multi-line position span into individual line positions.
         """
+        if self.line > self.end_line:
+            return []
+        if self.line == self.end_line:
+            return [CPos(self.line, self.col, self.line, self.end_col)]
+        # only the first and last line are partially highlighted
         return [
-            CPos(
-                line=line,
-                col=self.col if line == self.line else 1,
-                end_line=line,
-                end_col=-1 if line != self.end_line else self.end_col,
-            )
-            for line in range(self.line, self.end_line + 1)
+            CPos(self.line, self.col, self.line, -1),
+            *(CPos(line, 1, line, -1) for line in range(self.line + 1, self.end_line)),
+            CPos(self.end_line, 1, self.end_line, self.end_col),
         ]
 
     def __repr__(self):
@@ -83,6 +107,13 @@ class Error:
         name: Override for error type name display
     """
 
+    # name shown for the error type, the class name without the `n` prefix
+    display_name = "Error"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.display_name = cls.__name__.removeprefix("n")
+
     def __init__(
         self,
         message,
@@ -92,7 +123,10 @@ class Error:
         fatal=True,
         line_only=False,
     ):
-        code = zlib.decompress(module.code).decode("utf-8")
+        from rich.markup import escape
+
+        console = get_console()
+        code = module.source if pos is not None else ""
 
         if pos is None:
             cpos = None
@@ -103,47 +137,61 @@ class Error:
         else:
             raise TypeError(f"Invalid position type: {type(pos)}")
 
-        console.print(
+        # printed in a single call, which renders and writes the lines together
+        output = [
             f"[reset][at [blue]{('REPL' if module.path.endswith('/') else module.path) if module.path else 'unknown'}[/blue]:{cpos.line if cpos else '?'}:{cpos.col if cpos and not line_only else '?'}]"
-        )
+        ]
         if cpos is not None and not line_only:
-            if code and 0 < cpos.end_line <= len(code.splitlines()):
+            lines = code.splitlines()
+            if code and 0 < cpos.end_line <= len(lines):
                 for _cpos in cpos.split():
                     _cpos.end_line = (
-                        _cpos.end_line if _cpos.end_line > 0 else len(code.splitlines())
+                        _cpos.end_line if _cpos.end_line > 0 else len(lines)
                     )
                     _cpos.end_col = (
                         _cpos.end_col
                         if _cpos.end_col > 0
-                        else len(code.splitlines()[_cpos.line - 1]) + 1
+                        else len(lines[_cpos.line - 1]) + 1
                     )
 
-                    src = code.splitlines()[_cpos.line - 1]
+                    src = lines[_cpos.line - 1]
                     start = max(0, _cpos.col - 30)
                     end = min(len(src), _cpos.col + 30)
 
-                    bg = (
-                        " on red"
-                        if src[_cpos.col - 1 : _cpos.end_col - 1].strip() == ""
-                        else ""
-                    )
-
-                    highlighted = (
-                        f"{escape(src[start:_cpos.col-1])}"
-                        f"[reset][red{bg}]{escape(src[_cpos.col-1:_cpos.end_col-1])}{' ' if bg else ''}[/red{bg}]"
-                        f"{escape(src[_cpos.end_col-1:end])}"
-                    )
+                    left = src[start : _cpos.col - 1]
+                    mid = src[_cpos.col - 1 : _cpos.end_col - 1]
+                    # whitespace is highlighted with a background to stay visible
+                    if mid.strip() == "":
+                        mark, tail = "[red on red]", " [/red on red]"
+                    else:
+                        mark, tail = "[red]", "[/red]"
                     prefix = "..." if start > 0 else ""
-                    suffix = "..." if end < len(src) else ""
-
-                    console.print(
-                        f"[reset][dim][{_cpos.line}][/dim]   {prefix}[reset]{highlighted}{suffix}\n"
-                        f"{' ' * len( f'[{_cpos.line}]   {prefix}{src[start:_cpos.col-1]}')}[reset][red bold]{'^' * (_cpos.end_col - _cpos.col)}[/bold red]"
+                    label = f"[{_cpos.line}]   {prefix}"
+
+                    output.append(
+                        "".join(
+                            (
+                                f"[reset][dim][{_cpos.line}][/dim]   {prefix}[reset]",
+                                escape(left),
+                                "[reset]",
+                                mark,
+                                escape(mid),
+                                tail,
+                                escape(src[_cpos.end_col - 1 : end]),
+                                "..." if end < len(src) else "",
+                                "\n",
+                                " " * (len(label) + len(left)),
+                                "[reset][red bold]",
+                                "^" * (_cpos.end_col - _cpos.col),
+                                "[/bold red]",
+                            )
+                        )
                     )
 
-        console.print(
-            f"[bold blue]{name or self.__class__.__name__.removeprefix('n')}[/blue bold]{f': [blue]{message}[/blue]' if message else ''}"
+        output.append(
+            f"[bold blue]{name or self.display_name}[/blue bold]{f': [blue]{message}[/blue]' if message else ''}"
         )
+        console.print(*output, sep="\n")
 
         if fatal:
             sys.exit(1)
@@ -209,12 +257,9 @@ class LarkError(nSyntaxError):
         token = " "
         line, col = None, None
         uncaught = True
-        if (
-            m1 := re.search(
-                r"Unexpected token Token\('([^']*)', '[^']*'\) at line (\d+), column (\d+)\.\nExpected one of:",
-                message,
-            )
-        ) and (m2 := re.findall(r"\s\* (\w+)", message)):
+        if (m1 := _UNEXPECTED_EXPECTED.search(message)) and (
+            m2 := _EXPECTED.findall(message)
+        ):
             line, col = int(m1.group(2)), int(m1.group(3)) + 1
             if m1.group(1) == "$END":
                 message = "Unexpected end of input"
@@ -228,17 +273,9 @@ class LarkError(nSyntaxError):
                     pass
 
         if uncaught:
-            if (
-                m := re.search(
-                    r"No terminal matches '(.+)' in the current parser context, at line (\d+) col (\d+)",
-                    message,
-                )
-                or re.search(
-                    r"Unexpected token Token\('.+', '(.+)'\) at line (\d+), column (\d+)",
-                    message,
-                )
-            ) and uncaught:
-                token, line, col = m.group(1), int(m.group(2)), int(m.group(3))
+            if (m := _UNEXPECTED.search(message)) and uncaught:
+                token, line, col = (g for g in m.groups() if g is not None)
+                line, col = int(line), int(col)
                 message = f"Unexpected token '{token}'"
             else:
                 super().__init__(message, module=module, fatal=fatal)
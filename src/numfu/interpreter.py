@@ -6,9 +6,8 @@ Implements the core interpreter that evaluates NumFu ASTs.
 
 import dataclasses
 import math
-import pickle
 import sys
-import zlib
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
@@ -17,6 +16,7 @@ from typing import Any
 import lark
 import mpmath
 
+from . import jit
 from .ast_types import (
     Bool,
     Call,
@@ -35,8 +35,11 @@ from .ast_types import (
     Spread,
     String,
     Variable,
+    free_variables,
+    parameters,
 )
-from .builtins import Builtins
+from .builtins import BUILTINS, fast_trig, parallel
+from .bytecode import Code, Op, compile_expr
 from .classes import Module, State
 from .errors import (
     Error,
@@ -47,7 +50,10 @@ from .errors import (
 )
 from .modules import ImportResolver
 from .reconstruct import reconstruct
-from .typechecks import BuiltinFunc, InfiniteOf, type_name
+from .typechecks import OPERATORS, BuiltinFunc, InfiniteOf, type_name
+
+# number of results kept per memoized lambda
+MEMO_SIZE = 4096
 
 
 @dataclass
@@ -60,6 +66,38 @@ class Bounce:
     call_pos: Any
 
 
+@dataclass
+class Memo:
+    """
+    Results of a recursive lambda whose body only uses its parameters,
+    literals, operators, math functions and the name it is bound to.
+
+    Args:
+        name: Name the lambda calls itself by
+        guards: Math functions the body calls, by name
+        results: Results by the `_mpf_` tuples of the arguments
+        key: Position the guards were last checked at, results are only
+            kept for one position
+    """
+
+    name: str
+    guards: dict[str, BuiltinFunc]
+    results: dict = dataclasses.field(default_factory=dict)
+    key: Any = None
+
+
+@dataclass
+class Frame:
+    """Execution state of a single `Code` object in the bytecode loop"""
+
+    code: Code
+    state: State
+    is_tail: bool = False
+    locals: Sequence = ()
+    stack: list = dataclasses.field(default_factory=list)
+    saved: list[State] = dataclasses.field(default_factory=list)
+
+
 class Interpreter:
     """
     The main NumFu interpreter that evaluates AST nodes.
@@ -73,6 +111,8 @@ class Interpreter:
         rec_depth: Maximum recursion depth
         errormeta: Error context for reporting
         _print: Whether to print output or just return it at the end
+        fast_trig: Whether to trade accuracy for speed in sin, cos and tan
+        workers: Number of processes that large maps at high precision may use
     """
 
     def __init__(
@@ -82,6 +122,8 @@ class Interpreter:
         iter_depth: int = -1,
         fatal: bool = True,
         _print: bool = True,
+        fast_trig: bool = False,
+        workers: int = 1,
     ):
         sys.setrecursionlimit(rec_depth)
         mpmath.mp.dps = precision
@@ -90,19 +132,26 @@ class Interpreter:
 
         self.fatal = fatal
         self.precision = precision
+        self.fast_trig = fast_trig
+        self.workers = workers
         self._print = _print
 
         self.modules: dict[str, Module] = {}
         self.module_id: str
+        self.generation = 0  # incremented by every run, invalidates inline caches
 
-        self.builtins: dict[Any, Any] = {
-            getattr(v, "name", name): v
-            for name, v in Builtins.__dict__.items()
-            if not name.startswith("__")
-        }
+        self.builtins = BUILTINS
 
         self.output: list[str] = []  # this list collects all prints and program outputs
 
+        # type -> function(node, is_tail, state), filled in by `_handler`
+        self.dispatch: dict[type, Callable] = {}
+
+        # opcode -> handler function, indexed by `Op` value
+        self.handlers = tuple(
+            getattr(type(self), "_op_" + op.name.lower()) for op in sorted(Op)
+        )
+
     def put(self, o: str):
         self.output.append(o)
         if self._print:
@@ -181,14 +230,10 @@ class Interpreter:
         def is_placeholder(arg):
             return isinstance(arg, Variable) and arg.name == "_"
 
-        partial_env = state.env.copy()
-        arg_names = [a.lstrip("...") for a in this.arg_names]
+        partial_env = self._capture(free_variables(this), state.env)
+        arg_names, rest_index = parameters(this)
         filled_pos = []
 
-        rest_index = next(
-            (i for i, name in enumerate(this.arg_names) if name.startswith("...")), None
-        )
-
         for i, (orig_name, name) in enumerate(zip(this.arg_names, arg_names)):
             if i >= len(args):
                 break
@@ -223,23 +268,21 @@ class Interpreter:
             and (not p.startswith("...") or p.lstrip("...") not in partial_env)
         ]
 
-        tree = b""
-        if this.tree:
-            try:
-                t = pickle.loads(zlib.decompress(this.tree))
-                params_idx = next(
-                    i
-                    for i, c in enumerate(t.children)
+        tree = None
+        if this.tree is not None:
+            # the source tree is shared with other closures, so copy what changes
+            tree = lark.Tree(
+                this.tree.data,
+                [
+                    lark.Tree(
+                        "lambda_params",
+                        [p for i, p in enumerate(c.children) if i not in filled_pos],
+                    )
                     if isinstance(c, lark.Tree) and c.data == "lambda_params"
-                )
-                t.children[params_idx].children = [
-                    c
-                    for i, c in enumerate(t.children[params_idx].children)
-                    if i not in filled_pos
-                ]
-                tree = zlib.compress(pickle.dumps(t))
-            except zlib.error:
-                pass
+                    else c
+                    for c in this.tree.children
+                ],
+            )
 
         return Lambda(
             arg_names=remaining_params,
@@ -247,16 +290,19 @@ class Interpreter:
             pos=this.pos,
             curry=partial_env,
             tree=tree,
+            code=this.code,
         )
 
     def _eval_lists(self, exprs, state: State):
         r = []
         for expr in exprs:
             if isinstance(expr, List):
-                elements = [
-                    self._eval(arg, state=state.edit(env=expr.curry))
-                    for arg in expr.elements
-                ]
+                # numbers and strings evaluate to themselves
+                if all(type(e) is mpmath.mpf or type(e) is str for e in expr.elements):
+                    r.append(List(list(expr.elements), pos=expr.pos, curry=expr.curry))
+                    continue
+                inner = state if expr.curry is state.env else state.edit(env=expr.curry)
+                elements = [self._eval(arg, state=inner) for arg in expr.elements]
                 for i, res in enumerate(elements):
                     if isinstance(res, (List, Lambda)):
                         elements[i] = self._eval_lists([res], state=state)[0]
@@ -274,9 +320,9 @@ class Interpreter:
             return env[this.name]
         elif this.name in self._declared_constants(state.module, state.index):
             return self.modules[state.module].globals[this.name]
-        elif this.name in list(self.modules[state.module].imports.keys()):
+        elif this.name in (imports := self.modules[state.module].imports):
             # resolve variable which was imported from another module
-            module = self.modules[self.modules[state.module].imports[this.name]]
+            module = self.modules[imports[this.name]]
 
             res = self._eval(
                 self._eval(
@@ -299,25 +345,11 @@ class Interpreter:
 
     def _call(self, this: Call, is_tail: bool = False, state: State = State()):
         """
-        Execute a function call, handling built-in functions, user lambdas, and placeholders.
+        Execute a function call whose arguments contain spreads (...list).
 
-        1. Handle short-circuiting logical operators (&&, ||).
-        2. Evaluate the function expression to obtain the callable object.
-        3. Expand any spread (...list) arguments.
-        4. Evaluate all arguments.
-        5. If any arguments are placeholders (_):
-           - For BuiltinFunc: return a placeholder-aware partial wrapper
-           - For Lambda: return a curried Lambda via _partial_lambda
-        6. Otherwise, dispatch normally
+        Calls without spreads are compiled to bytecode, this is the
+        tree-walking equivalent of the ENTER_CALL / CALL instruction pair.
         """
-
-        # Handle short-circuiting
-        if isinstance(this.func, Variable) and this.func.name in ("&&", "||"):
-            left = self._eval(this.args[0], state=state)
-            if this.func.name == "&&":
-                return bool(self._eval(this.args[1], state=state)) if left else False
-            return True if left else bool(self._eval(this.args[1], state=state))
-
         func = self._eval(this.func, state=state)  # type: ignore
         if isinstance(func, Lambda) and func.pos.module is not None:
             state = state.edit(module=func.pos.module)
@@ -326,6 +358,25 @@ class Interpreter:
             self._eval(a, state=state)
             for a in self._resolve_spread(this.args, state=state)
         ]
+        return self._apply(this, func, args, is_tail=is_tail, state=state)
+
+    def _apply(
+        self,
+        this: Call,
+        func,
+        args: list,
+        is_tail: bool = False,
+        state: State = State(),
+    ):
+        """
+        Apply an evaluated function to evaluated arguments, handling built-in
+        functions, user lambdas, and placeholders.
+
+        1. If any arguments are placeholders (_):
+           - For BuiltinFunc: return a placeholder-aware partial wrapper
+           - For Lambda: return a curried Lambda via _partial_lambda
+        2. Otherwise, dispatch normally
+        """
         has_placeholder = any(isinstance(a, Variable) and a.name == "_" for a in args)
 
         # BuiltinFunc partial application
@@ -383,15 +434,19 @@ class Interpreter:
 
             args = [a.expr if isinstance(a, PrintOutput) else a for a in args]
 
-            r = func(
-                *args,
-                module=self.modules[state.module],
-                args_pos=this.pos,
-                func_pos=getattr(this.func, "pos", None),  # type: ignore
-                precision=self.precision,
-                interpreter=self if func.name == "filter" else None,
-                state=state,
-            )
+            # argument types seen before go straight to their implementation
+            if (impl := func.resolved.get(tuple(map(type, args)))) is not None:
+                r = impl(*args)
+            else:
+                r = func(
+                    *args,
+                    module=self.modules[state.module],
+                    args_pos=this.pos,
+                    func_pos=getattr(this.func, "pos", None),  # type: ignore
+                    precision=self.precision,
+                    interpreter=self if func.name == "filter" else None,
+                    state=state,
+                )
 
             if isinstance(r, mpmath.mpc):
                 return r if r.imag == 0 else mpmath.nan  # type: ignore
@@ -409,13 +464,28 @@ class Interpreter:
             nTypeError, f"{type_name(func)} is not callable", pos=this.pos, state=state
         )
 
+    def _apply_each(self, func, elements: list, pos: Pos, state: State = State()):
+        """
+        Evaluate `func(element)` for every element. The function is only
+        evaluated once and no Call node is built (and compiled) per element.
+        """
+        call = Call(func, [], pos=pos)
+        func = self._eval(func, state=state)
+        if (
+            isinstance(func, Lambda)
+            and func.pos.module is not None
+            and func.pos.module != state.module
+        ):
+            state = state.edit(module=func.pos.module)
+        return [
+            self._apply(call, func, [self._eval(e, state=state)], state=state)
+            for e in elements
+        ]
+
     def _builtinfunc(self, this: BuiltinFunc, state: State = State()):
         return this
 
-    def _index(self, this: Index, state: State = State()):
-        target = self._eval(this.target, state=state)
-        index = self._eval(this.index, state=state)
-
+    def _subscript(self, this: Index, target, index, state: State = State()):
         if isinstance(target, (List, str)):
             if not isinstance(index, mpmath.mpf):
                 self.exception(
@@ -425,7 +495,10 @@ class Interpreter:
                     state=state,
                 )
 
-            if index % 1 != 0:  # type: ignore
+            # mantissas are normalized to be odd, so a number is an integer
+            # exactly when its exponent is non-negative; inf and nan have
+            # negative exponents too
+            if index._mpf_[2] < 0:  # type: ignore
                 self.exception(
                     nTypeError,
                     f"{type_name(type(target))} index must be an integer, not a floating-point number",
@@ -433,8 +506,11 @@ class Interpreter:
                     state=state,
                 )
 
+            n = len(target)
             idx = int(index)  # type: ignore
-            if idx >= len(target) or idx < -len(target):
+            if idx < 0:
+                idx += n
+            if not 0 <= idx < n:
                 self.exception(
                     nIndexError,
                     f"{type_name(type(target))} index out of range",
@@ -442,9 +518,6 @@ class Interpreter:
                     state=state,
                 )
 
-            if idx < 0:
-                idx = len(target) + idx
-
             if isinstance(target, str):
                 return target[idx]
             else:
@@ -484,23 +557,13 @@ class Interpreter:
         return elements
 
     def _list(self, this: List, state: State = State()):
-        this.curry = state.env.copy()
+        this.curry = self._capture(free_variables(this), state.env)
         this.elements = self._resolve_spread(this.elements, state=state)
         return this
 
     def _spread(self, this: Spread, state: State = State()):
         return this
 
-    def _conditional(
-        self, this: Conditional, is_tail: bool = False, state: State = State()
-    ):
-        condition = self._eval(this.test, state=state)
-        return self._eval(
-            this.then_body if condition else this.else_body,
-            is_tail=is_tail,
-            state=state,
-        )
-
     def _lambda(
         self,
         this: Lambda,
@@ -542,19 +605,40 @@ class Interpreter:
                     state=state,
                 )
 
+            # bodies the JIT has rejected are not looked at again
+            if (
+                self._body(current_lambda).native is not False
+                and (
+                    native := self._native(
+                        current_lambda, current_args, current_env, state
+                    )
+                )
+                is not None
+            ):
+                try:
+                    return native(*current_args)
+                except (jit.Deopt, ZeroDivisionError, ValueError):
+                    pass  # the interpreter takes over and reports any error
+
             new_env = current_env.copy()
             new_env.update(current_lambda.curry)
 
-            catch_rest = any(arg.startswith("...") for arg in current_lambda.arg_names)
-            arg_names = [arg.lstrip("...") for arg in current_lambda.arg_names.copy()]
+            arg_names, rest_index = parameters(current_lambda)
+            catch_rest = rest_index is not None
 
             # more arguments than parameters
             if len(current_args) > len(arg_names) and not catch_rest:
                 # apply all parameters and evaluate the body
                 filled_env = new_env.copy()
                 filled_env.update(zip(arg_names, current_args[: len(arg_names)]))
-                result = self._eval(
-                    current_lambda.body, is_tail=True, state=state.edit(env=filled_env)
+                code = self._body(current_lambda)
+                result = self._exec(
+                    code,
+                    is_tail=True,
+                    state=state.edit(env=filled_env),
+                    locals=self._locals(
+                        code, arg_names, current_args[: len(arg_names)], filled_env
+                    ),
                 )
 
                 # if result is callable, call it with remaining args
@@ -593,12 +677,36 @@ class Interpreter:
                         zip(arg_names[:-1], current_args[: len(arg_names[:-1])])
                     )
                     new_env[arg_names[-1]] = List(current_args[len(arg_names[:-1]) :])
+                    values = [
+                        *current_args[: len(arg_names[:-1])],
+                        new_env[arg_names[-1]],
+                    ]
                 else:
                     new_env.update(zip(arg_names, current_args))
+                    values = current_args
 
-                result = self._eval(
-                    current_lambda.body, is_tail=True, state=state.edit(env=new_env)
+                code = self._body(current_lambda)
+                memo = (
+                    code.memo is not False
+                    and not catch_rest
+                    and self._memo(current_lambda, code, current_args, new_env, state)
                 )
+                if memo:
+                    key = tuple(arg._mpf_ for arg in current_args)
+                    if (cached := memo.results.get(key)) is not None:
+                        return cached
+
+                result = self._exec(
+                    code,
+                    is_tail=True,
+                    state=state.edit(env=new_env),
+                    locals=self._locals(code, arg_names, values, new_env),
+                )
+
+                if memo and isinstance(result, (mpmath.mpf, bool)):
+                    memo.results[key] = result
+                    if len(memo.results) > MEMO_SIZE:
+                        del memo.results[next(iter(memo.results))]
 
                 if isinstance(result, Bounce):
                     if isinstance(result.func, Lambda):
@@ -609,7 +717,7 @@ class Interpreter:
                 return result
 
     def _number(self, this: Number, state: State = State()):
-        return mpmath.mpf(this.value)
+        return this.mpf
 
     def _string(self, this: String, state: State = State()):
         return this.value
@@ -631,62 +739,435 @@ class Interpreter:
                 printed=True,
             )
 
-    def _eval(
-        self, node: Expr | BuiltinFunc, is_tail: bool = False, state: State = State()
-    ):
+    def _closure(self, node: Lambda, state: State = State()) -> Lambda:
+        # Don't re-evaluate lambdas that already have a curry environment
+        if hasattr(node, "curry") and node.curry:
+            curry = node.curry | self._capture(free_variables(node), state.env)
+        else:
+            curry = self._capture(free_variables(node), state.env)
+
+        # closures keep the module of the deeper of the defining and current
+        # module; positions are never modified, so an unchanged one is shared
+        module = (
+            state.module
+            if self.modules[state.module].depth
+            >= self.modules.get(
+                node.pos.module,  # type: ignore
+                self.modules[state.module],
+            ).depth
+            else node.pos.module
+        )
+        pos = (
+            node.pos
+            if module == node.pos.module
+            else dataclasses.replace(node.pos, module=module)
+        )
+
+        return Lambda(
+            arg_names=node.arg_names,
+            body=node.body,
+            curry=curry,
+            tree=node.tree,
+            free_vars=free_variables(node),
+            params=parameters(node),
+            pos=pos,
+            code=self._body(node),
+        )
+
+    def _capture(self, names: frozenset[str], env: dict) -> dict:
+        """
+        Copy the bindings a closure needs out of `env`. Lambdas are looked up
+        in their caller's environment for names missing from their own curry
+        (this is how mutually recursive let bindings work), so those names are
+        captured as well, also for lambdas held in lists or other curries.
+        """
+        curry = {}
+        pending = list(names)
+        values: list = []
+        seen: set[int] = set()
+        while pending or values:
+            if values:
+                value = values.pop()
+                if id(value) in seen:
+                    continue
+                seen.add(id(value))
+                if isinstance(value, Lambda):
+                    pending.extend(
+                        n for n in free_variables(value) if n not in value.curry
+                    )
+                    inner = value.curry.values()
+                else:
+                    inner = (*value.elements, *value.curry.values())
+                values.extend(v for v in inner if isinstance(v, (Lambda, List)))
+                continue
+            name = pending.pop()
+            if name in curry or name not in env:
+                continue
+            value = curry[name] = env[name]
+            if isinstance(value, (Lambda, List)):
+                values.append(value)
+        return curry
+
+    def _native(self, this: Lambda, args: list, env: dict, state: State = State()):
+        """Return the JIT-compiled body of a lambda if it can run these args"""
+        code = self._body(this)
+        if code.native is None:
+            code.calls += 1
+            if code.calls < jit.THRESHOLD:
+                return None
+            code.native = (
+                jit.jit(this, self.builtins, lambda name: self._static(name, state))
+                or False
+            )
+
+        native = code.native
         if (
-            hasattr(node, "pos")
-            and hasattr(node.pos, "index")  # type: ignore
-            and node.pos.index is not None  # type: ignore
+            native
+            and native.params == this.arg_names
+            and len(args) == len(this.arg_names)
+            and all(type(arg) is mpmath.mpf for arg in args)
+            and (not native.guards or self._guards_hold(native, this, env, state))
         ):
-            state = state.edit(index=node.pos.index)  # type: ignore
-        if isinstance(node, Lambda):
-            # Don't re-evaluate lambdas that already have a curry environment
-            if hasattr(node, "curry") and node.curry:
-                curry = node.curry.copy() | state.env
+            return native
+
+    def _memo(
+        self, this: Lambda, code: Code, args: list, env: dict, state: State
+    ) -> Memo | None:
+        """
+        Return the memo of a lambda if its result for `args` only depends on
+        the arguments, i.e. it calls itself and math functions only
+        """
+        if code.memo is None:
+            code.memo = self._memoizable(this, env, state) or False
+        memo = code.memo
+        if not memo or any(type(arg) is not mpmath.mpf for arg in args):
+            return None
+        if this.pos.module is not None and this.pos.module != state.module:
+            return None
+
+        # the lambda must be what its name refers to, also in the calls it
+        # makes, which see the same environment
+        if memo.name in env:
+            if env[memo.name] is not this:
+                return None
+        elif memo.name not in self._declared_constants(state.module, state.index) or (
+            self.modules[state.module].globals.get(memo.name) is not this
+        ):
+            return None
+
+        if any(name in env for name in memo.guards):
+            return None
+        key = (self.generation, state.module, state.index)
+        if memo.key != key:
+            if any(
+                self._static(name, state) is not func
+                for name, func in memo.guards.items()
+            ):
+                return None
+            memo.key = key
+            memo.results.clear()
+        return memo
+
+    def _memoizable(self, this: Lambda, env: dict, state: State) -> Memo | None:
+        """Find the name a lambda calls itself by and the math functions it uses"""
+
+        def pure(node) -> bool:
+            match node:
+                case Number() | Bool() | Variable():
+                    return True
+                case Conditional():
+                    return (
+                        pure(node.test)
+                        and pure(node.then_body)
+                        and pure(node.else_body)
+                    )
+                case Call(func=Variable()):
+                    return all(pure(arg) for arg in node.args)
+            return False
+
+        if not pure(this.body):
+            return None
+        name, guards = None, {}
+        # sorted, so the outcome never depends on set iteration order
+        for free in sorted(free_variables(this) - OPERATORS):
+            func = None if free in env else self._static(free, state)
+            if any(func is f for f in jit._MATH):
+                guards[free] = func
+            elif name is None:
+                name = free
             else:
-                curry = state.env.copy()
-
-            lambda_copy = Lambda(
-                arg_names=node.arg_names,
-                body=node.body,
-                curry=curry,
-                tree=node.tree,
-                pos=dataclasses.replace(
-                    node.pos,
-                    module=state.module
-                    if self.modules[state.module].depth
-                    >= self.modules.get(
-                        node.pos.module,  # type: ignore
-                        self.modules[state.module],
-                    ).depth
-                    else node.pos.module,
-                ),
+                return None
+        return Memo(name, guards) if name is not None else None
+
+    def _static(self, name: str, state: State = State()):
+        """
+        What a name refers to if it is not bound in the environment, as long as
+        that is an import or a builtin
+        """
+        if name in self._declared_constants(state.module, state.index):
+            return None
+        if name in self.modules[state.module].imports:
+            return self._variable(Variable.intern(name), state=state)
+        return self.builtins.get(name)
+
+    def _guards_hold(self, native, this: Lambda, env: dict, state: State) -> bool:
+        """Whether the functions a compiled body calls are still what its names mean"""
+        if any(name in env or name in this.curry for name in native.guards):
+            return False
+        # imports and constants only change with the position in the program
+        key = (self.generation, state.module, state.index)
+        if native.key != key:
+            if any(
+                self._static(name, state) is not func
+                for name, func in native.guards.items()
+            ):
+                return False
+            native.key = key
+        return True
+
+    def _compiled(self, node: Call | Conditional | Index) -> Code:
+        """Return the bytecode of a node, compiling it on first use"""
+        if node.code is None or node.code.prec != mpmath.mp.prec:
+            node.code = compile_expr(node)
+        return node.code
+
+    def _body(self, this: Lambda) -> Code:
+        """Return the bytecode of a lambda body, compiling it on first call"""
+        if this.code is None or this.code.prec != mpmath.mp.prec:
+            this.code = compile_expr(
+                this.body,
+                root=False,
+                params=parameters(this)[0],
             )
-            return lambda_copy
-        elif isinstance(node, (float, int, mpmath.mpf)):
-            return mpmath.mpf(node)
+        return this.code
+
+    def _locals(self, code: Code, arg_names: tuple[str, ...], values: list, env: dict):
+        """
+        Arrange the argument values in the slots `code` reads them from. Partially
+        applied lambdas share the code of the original one, so their parameters
+        no longer line up with the slots and are looked up by name instead.
+        """
+        if code.params == arg_names:
+            return values
+        return [env[name] for name in code.params]
+
+    def _exec(
+        self,
+        code: Code,
+        is_tail: bool = False,
+        state: State = State(),
+        locals: Sequence = (),
+    ):
+        """
+        Run a compiled expression. Each handler returns None to continue with
+        the next instruction, a jump target, or -1 once the value is ready.
+        """
+        frame = Frame(code, state, is_tail, locals)
+        ops = code.threaded if code.threaded is not None else self._thread(code)
+        pc = 0
+        while True:
+            target = ops[pc](self, frame, ops[pc + 1])
+            if target is None:
+                pc += 2
+            elif target < 0:
+                return frame.stack.pop()
+            else:
+                pc = target
+
+    def _thread(self, code: Code) -> list:
+        """
+        Replace every opcode by its handler function, so dispatching an
+        instruction is a single list access.
+        """
+        code.threaded = [
+            self.handlers[x] if i % 2 == 0 else x for i, x in enumerate(code.code)
+        ]
+        return code.threaded
+
+    def _op_load_const(self, frame: Frame, arg: int):
+        frame.stack.append(frame.code.consts[arg])
+
+    def _op_load_name(self, frame: Frame, arg: int):
+        node = frame.code.names[arg]
+        state = frame.state
+        if node.name in state.env:
+            frame.stack.append(state.env[node.name])
+            return
+
+        # Builtins are only shadowed by constants and imports, which depend on
+        # the position in the program, so resolutions are cached per position
+        key = (self.generation, state.module, state.index)
+        if (entry := frame.code.cache[arg]) is not None and entry[0] == key:
+            frame.stack.append(entry[1])
+            return
+
+        value = self._variable(node, state=state)
+        if node.name not in self._declared_constants(state.module, state.index):
+            if (target := self.modules[state.module].imports.get(node.name)) is None:
+                cacheable = node.name in self.builtins
+            else:
+                # an imported builtin is stored as is in the exporting module,
+                # other imports are evaluated again on every lookup
+                cacheable = isinstance(value, BuiltinFunc) and value is self.modules[
+                    target
+                ].globals.get(node.name.split(".")[-1])
+            if cacheable:
+                frame.code.cache[arg] = (key, value)
+        frame.stack.append(value)
+
+    def _op_load_local(self, frame: Frame, arg: int):
+        frame.stack.append(frame.locals[arg])
+
+    def _op_make_lambda(self, frame: Frame, arg: int):
+        frame.stack.append(self._closure(frame.code.consts[arg], state=frame.state))
+
+    def _op_enter_call(self, frame: Frame, arg: int):
+        # arguments are evaluated in the module the called lambda belongs to
+        func = frame.stack[-1]
+        frame.saved.append(frame.state)
+        if (
+            isinstance(func, Lambda)
+            and func.pos.module is not None
+            and func.pos.module != frame.state.module
+        ):
+            frame.state = frame.state.edit(module=func.pos.module)
+
+    def _op_call(self, frame: Frame, arg: int, is_tail: bool = False):
+        this = frame.code.consts[arg]
+        stack = frame.stack
+        args = stack[len(stack) - len(this.args) :]
+        del stack[len(stack) - len(this.args) :]
+        func = stack.pop()
+        stack.append(self._apply(this, func, args, is_tail=is_tail, state=frame.state))
+        frame.state = frame.saved.pop()
+
+    def _op_call_operator(self, frame: Frame, arg: int):
+        this, func = frame.code.consts[arg]
+        stack = frame.stack
+        args = stack[len(stack) - len(this.args) :]
+        del stack[len(stack) - len(this.args) :]
+        key = tuple(map(type, args))
+        # lists still have to be evaluated for operators comparing them
+        if (impl := func.resolved.get(key)) is None or (
+            func.eval_lists and List in key
+        ):
+            stack.append(self._apply(this, func, args, state=frame.state))
+            return
+
+        r = impl(*args)
+        if isinstance(r, mpmath.mpc):
+            r = r if r.imag == 0 else mpmath.nan
+        elif isinstance(r, PrintOutput):
+            r = self._eval(r, state=frame.state)
+        stack.append(r)
+
+    def _op_tail_call(self, frame: Frame, arg: int):
+        self._op_call(frame, arg, is_tail=frame.is_tail)
+
+    def _op_call_spread(self, frame: Frame, arg: int):
+        frame.stack.append(self._call(frame.code.consts[arg], state=frame.state))
+
+    def _op_tail_call_spread(self, frame: Frame, arg: int):
+        frame.stack.append(
+            self._call(frame.code.consts[arg], is_tail=frame.is_tail, state=frame.state)
+        )
+
+    def _op_jmp_if_false(self, frame: Frame, arg: int):
+        # conditions are almost always booleans, which skips the __bool__ call
+        value = frame.stack.pop()
+        if value is False or (value is not True and not value):
+            return arg
+
+    def _op_jmp_if_true(self, frame: Frame, arg: int):
+        value = frame.stack.pop()
+        if value is True or (value is not False and value):
+            return arg
+
+    def _op_jmp(self, frame: Frame, arg: int):
+        return arg
+
+    def _op_to_bool(self, frame: Frame, arg: int):
+        frame.stack[-1] = bool(frame.stack[-1])
+
+    def _op_index(self, frame: Frame, arg: int):
+        index = frame.stack.pop()
+        target = frame.stack.pop()
+        frame.stack.append(
+            self._subscript(frame.code.consts[arg], target, index, state=frame.state)
+        )
+
+    def _op_eval(self, frame: Frame, arg: int):
+        frame.stack.append(self._eval(frame.code.consts[arg], state=frame.state))
+
+    def _op_tail_eval(self, frame: Frame, arg: int):
+        frame.stack.append(
+            self._eval(frame.code.consts[arg], is_tail=frame.is_tail, state=frame.state)
+        )
+
+    def _op_return(self, frame: Frame, arg: int):
+        return -1
+
+    def _op_load_pure(self, frame: Frame, arg: int):
+        value = frame.code.consts[arg]
+        if isinstance(value, Call):
+            value = frame.code.consts[arg] = self._fold(value, state=frame.state)
+        frame.stack.append(value)
+
+    def _fold(self, node: Expr, state: State = State()):
+        """Evaluate an expression for which `bytecode.is_pure` holds"""
+        if isinstance(node, Call):
+            args = [self._fold(arg, state=state) for arg in node.args]
+            func = self._variable(node.func, state=state)  # type: ignore
+            return self._apply(node, func, args, state=state)
+        return self._eval(node, state=state)
+
+    def _eval(
+        self, node: Expr | BuiltinFunc, is_tail: bool = False, state: State = State()
+    ):
+        if (index := getattr(getattr(node, "pos", None), "index", None)) is not None:
+            state = state.edit(index=index)
+        handler = self.dispatch.get(type(node)) or self._handler(type(node))
+        return handler(node, is_tail, state)
+
+    def _handler(self, typ: type) -> Callable:
+        """Find the function evaluating values of a type and add it to the jump table"""
+        if issubclass(typ, (Call, Conditional, Index)):
+
+            def handler(node, is_tail, state):
+                return self._exec(self._compiled(node), is_tail=is_tail, state=state)
+
+        elif issubclass(typ, Lambda):
+
+            def handler(node, is_tail, state):
+                return self._closure(node, state=state)
+
+        elif issubclass(typ, (float, int, mpmath.mpf)):
+
+            def handler(node, is_tail, state):
+                return mpmath.mpf(node)
+
         elif (
-            isinstance(node, str)
-            or type(node).__name__
+            issubclass(typ, str)
+            or typ.__name__
             == "constant"  # for some reason,  mpmath.ctx_mp_python.constant is not available
         ):
-            return node
-        elif node is None:
-            return mpmath.mpf(0)
-        try:
-            name = type(node).__name__.lower()
-            return getattr(self, "_" + name)(
-                node,
-                **(
-                    {"is_tail": is_tail}
-                    if name in ("lambda", "conditional", "call")
-                    else {}
-                ),
-                state=state,
-            )
-        except AttributeError as e:
-            raise e
+
+            def handler(node, is_tail, state):
+                return node
+
+        elif typ is type(None):
+
+            def handler(node, is_tail, state):
+                return mpmath.mpf(0)
+
+        else:
+            method = getattr(self, "_" + typ.__name__.lower())
+
+            def handler(node, is_tail, state):
+                return method(node, state=state)
+
+        self.dispatch[typ] = handler
+        return handler
 
     def get_repr(self, node: Expr, state: State = State()) -> Any:
         if isinstance(node, (Number, mpmath._ctx_mp._mpf)):
@@ -710,7 +1191,7 @@ class Interpreter:
                 if isinstance(res, mpmath.mpf):
                     elements[i] = Number(mpmath.nstr(res, self.precision))  # type: ignore
                 elif isinstance(res, bool):
-                    elements[i] = Bool(res)
+                    elements[i] = Bool.intern(res)
                 elif isinstance(res, str):
                     elements[i] = String(res)
                 elif isinstance(res, (List, Lambda)):
@@ -726,6 +1207,18 @@ class Interpreter:
         code: str = "",
         env: dict[str, Expr] = {},
         modules: dict[str, Module] = {},  # for REPL persistence
+    ):
+        # these settings only apply to the interpreter running
+        with fast_trig(self.fast_trig), parallel(self.workers):
+            return self._run(tree, path, code, env, modules)
+
+    def _run(
+        self,
+        tree: list[Expr],
+        path: str | Path | None,
+        code: str,
+        env: dict[str, Expr],
+        modules: dict[str, Module],
     ):
         if path and not str(path).endswith("/") and not code:
             try:
@@ -735,6 +1228,7 @@ class Interpreter:
 
         path = str(path) if path else "unknown"
         pos = None
+        self.generation += 1
 
         try:
             self.modules = ImportResolver().resolve(tree, path=path, code=code)
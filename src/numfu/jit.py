@@ -0,0 +1,171 @@
+"""
+Just-in-time Compilation of Arithmetic Lambdas
+
+Lambdas whose body only combines their parameters and number literals with
+operators and math functions are translated into Python functions once they
+have been called often enough. Calling such a function skips environment
+setup and builtin dispatch entirely. Anything else keeps running on the
+interpreter.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+import mpmath
+
+from .ast_types import Bool, Call, Conditional, Lambda, Number, Variable
+from .builtins import Math
+from .typechecks import BuiltinFunc
+
+# number of calls after which a lambda body is compiled
+THRESHOLD = 100
+
+NUM, BOOL, ANY = "num", "bool", "any"
+
+# operator -> (operand type, result type)
+_OPERATORS = {
+    "+": (NUM, NUM),
+    "-": (NUM, NUM),
+    "*": (NUM, NUM),
+    "/": (NUM, NUM),
+    "%": (NUM, NUM),
+    "^": (NUM, NUM),
+    "<": (NUM, BOOL),
+    ">": (NUM, BOOL),
+    "<=": (NUM, BOOL),
+    ">=": (NUM, BOOL),
+    "==": (ANY, BOOL),
+    "!=": (ANY, BOOL),
+    "!": (ANY, BOOL),
+}
+
+
+class Deopt(Exception):
+    """Raised by compiled code when a value leaves the types it was compiled for"""
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _checked(value):
+    # powers of negative numbers are complex, which the interpreter rejects
+    if type(value) is not mpmath.mpf:
+        raise Deopt
+    return value
+
+
+# functions of the math module, which are pure and return numbers
+_MATH = tuple(v for v in vars(Math).values() if isinstance(v, BuiltinFunc))
+
+
+class _Compiler:
+    def __init__(
+        self,
+        params: list[str],
+        builtins: dict,
+        resolve: Callable[[str], Any] | None = None,
+    ):
+        self.params = {name: f"_a{i}" for i, name in enumerate(params)}
+        self.builtins = builtins
+        self.resolve = resolve
+        self.guards: dict[str, Any] = {}
+        self.namespace: dict = {"_checked": _checked}
+
+    def bind(self, value) -> str:
+        name = f"_k{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def expr(self, node) -> tuple[str, str]:
+        """Return Python source for `node` and the type of its value"""
+        match node:
+            case Number():
+                return self.bind(node.mpf), NUM
+            case Bool():
+                return repr(node.value), BOOL
+            case Variable() if node.name in self.params:
+                return self.params[node.name], NUM
+            case Conditional():
+                test, _ = self.expr(node.test)
+                then, then_type = self.expr(node.then_body)
+                other, else_type = self.expr(node.else_body)
+                return (
+                    f"({then} if {test} else {other})",
+                    then_type if then_type == else_type else ANY,
+                )
+            case Call(func=Variable(name="&&" | "||" as name)):
+                left, _ = self.expr(node.args[0])
+                right, _ = self.expr(node.args[1])
+                op = "and" if name == "&&" else "or"
+                return f"(bool({left}) {op} bool({right}))", BOOL
+            case Call(func=Variable(name=name)) if name in _OPERATORS:
+                operand, result = _OPERATORS[name]
+                args = [self.expr(arg) for arg in node.args]
+                if operand == NUM and any(t != NUM for _, t in args):
+                    raise _Unsupported
+                impl = self.builtins[name].direct(*[mpmath.mpf(0)] * len(args))
+                if impl is None:
+                    raise _Unsupported
+                source = f"{self.bind(impl)}({', '.join(src for src, _ in args)})"
+                if name == "^":
+                    source = f"_checked({source})"
+                return source, result
+            case Call(func=Variable(name=name)) if (
+                self.resolve and name not in self.params
+            ):
+                func = self.guards.get(name) or self.resolve(name)
+                if not any(func is f for f in _MATH):
+                    raise _Unsupported
+                args = [self.expr(arg) for arg in node.args]
+                if any(t != NUM for _, t in args):
+                    raise _Unsupported
+                impl = func.direct(*[mpmath.mpf(0)] * len(args))
+                if impl is None:
+                    raise _Unsupported
+                self.guards[name] = func
+                call = f"{self.bind(impl)}({', '.join(src for src, _ in args)})"
+                # results outside the real numbers are left to the interpreter
+                return f"_checked({call})", NUM
+        raise _Unsupported
+
+
+def jit(
+    this: Lambda, builtins: dict, resolve: Callable[[str], Any] | None = None
+) -> Callable | None:
+    """
+    Compile the body of a lambda into a Python function taking the same
+    parameters. The function must only be called with mpf arguments.
+
+    The math functions it calls are recorded in the `guards` attribute of the
+    function, by name. The caller must make sure the names still refer to
+    them before each call.
+
+    Args:
+        this: Lambda to compile
+        builtins: Builtin functions by name, used to look up operators
+        resolve: Returns what a name used by the body currently refers to
+
+    Returns:
+        The compiled function, or None if the body uses anything but
+        parameters, literals, operators, math functions and conditionals
+    """
+    if any(name.startswith("...") for name in this.arg_names) or len(
+        set(this.arg_names)
+    ) != len(this.arg_names):
+        return None
+
+    compiler = _Compiler(this.arg_names, builtins, resolve)
+    try:
+        source, _ = compiler.expr(this.body)
+    except _Unsupported:
+        return None
+
+    args = ", ".join(compiler.params.values())
+    # the source only names parameters and values bound in the namespace
+    exec(f"def native({args}):\n    return {source}\n", compiler.namespace)  # noqa: S102
+    native = compiler.namespace["native"]
+    native.params = list(this.arg_names)
+    native.guards = compiler.guards
+    native.key = None  # position the guards were last checked at
+    return native
@@ -2,7 +2,6 @@ import hashlib
 import importlib.resources
 import itertools
 import pickle
-import zlib
 from functools import lru_cache
 from pathlib import Path
 
@@ -59,7 +58,7 @@ class ImportResolver:
                 tree.append(
                     Export(
                         names=[
-                            Variable(getattr(v, "name", name))
+                            Variable.intern(getattr(v, "name", name))
                             for name, v in available.items()
                         ]
                     )
@@ -118,7 +117,7 @@ class ImportResolver:
                 f"Circular import detected:\n{cycle_str}",
                 module=Module(
                     path=self.path,
-                    code=zlib.compress(self.current_code.encode("utf-8")),
+                    code=self.current_code.encode("utf-8"),
                     depth=len(self._import_stack),
                 ),
             )
@@ -162,7 +161,7 @@ class ImportResolver:
                 f"Circular import detected:\n{cycle_str}",
                 module=Module(
                     path=self.path,
-                    code=zlib.compress(self.current_code.encode("utf-8")),
+                    code=self.current_code.encode("utf-8"),
                     depth=len(self._import_stack),
                 ),
             )
@@ -218,7 +217,7 @@ class ImportResolver:
                             unknown_import.pos if unknown_import else None,
                             module=Module(
                                 path=str(path),
-                                code=zlib.compress(code.encode("utf-8")),
+                                code=code.encode("utf-8"),
                                 depth=len(self._import_stack),
                             ),
                         )
@@ -234,7 +233,7 @@ class ImportResolver:
 
         self.modules[_id(path)] = Module(
             path=str(path),
-            code=zlib.compress(code.encode()),
+            code=code.encode(),
             id=_id(path),
             tree=[
                 expr
@@ -278,7 +277,7 @@ class ImportResolver:
                         node.pos,
                         module=Module(
                             path=str(path),
-                            code=zlib.compress(code.encode("utf-8")),
+                            code=code.encode("utf-8"),
                             depth=len(self._import_stack),
                         ),
                     )
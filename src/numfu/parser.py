@@ -7,9 +7,8 @@ done here.
 """
 
 import codecs
-import pickle
 import re
-import zlib
+import sys
 from pathlib import Path
 
 from lark import Lark, Token, Transformer, Tree, v_args
@@ -54,10 +53,20 @@ KEYWORDS = {
 }
 
 
+# comparison operators that can be chained, like a < b <= c
+CHAINABLE_OPERATORS = frozenset(("<", "<=", ">", ">="))
+EQUALITY_OPERATORS = frozenset(("==", "!="))
+
+
 def _tokpos(token: Token):
     return Pos(token.start_pos, token.end_pos)
 
 
+def _operator(token: Token) -> Variable:
+    # operator names are looked up in the builtins on every call
+    return Variable(sys.intern(str(token)), pos=_tokpos(token))
+
+
 def _find_tree_end_pos(node):
     return (
         node.children[-1].end_pos
@@ -106,12 +115,33 @@ def validate_imports(tree: Tree) -> Tree | None:
             return node
 
 
+class LambdaSource:
+    """Parse tree of a lambda, kept out of reach of the AST generator"""
+
+    __slots__ = ("tree",)
+
+    def __init__(self, tree: Tree):
+        self.tree = tree
+
+
+def _source_tree(tree):
+    """
+    Copy a subtree, replacing lambdas handled by LambdaPreprocessor with
+    their attached source tree.
+    """
+    if not isinstance(tree, Tree):
+        return tree
+    if tree.data == "lambda_def" and isinstance(tree.children[0], LambdaSource):
+        return tree.children[0].tree
+    return Tree(tree.data, [_source_tree(c) for c in tree.children])
+
+
 @v_args(inline=True)
 class LambdaPreprocessor(Transformer):
     def lambda_def(self, *args):
         return Tree(
             "lambda_def",
-            [zlib.compress(pickle.dumps(Tree("lambda_def", list(args)))).hex(), *args],
+            [LambdaSource(_source_tree(Tree("lambda_def", list(args)))), *args],
         )
 
 
@@ -145,7 +175,7 @@ class AstGenerator(Transformer):
 
     def bin_op(self, left, op, right):
         return Call(
-            Variable(str(op), pos=_tokpos(op)),
+            _operator(op),
             [left, right],
             pos=Pos(left.pos.start, right.pos.end),
         )
@@ -160,23 +190,20 @@ class AstGenerator(Transformer):
         if len(args) == 3:
             left, op, right = args
             return Call(
-                Variable(str(op), pos=_tokpos(op)),
+                _operator(op),
                 [left, right],
                 pos=Pos(left.pos.start, right.pos.end),
             )
 
-        chainable_ops = {"<", "<=", ">", ">="}
-        equality_ops = {"==", "!="}
-
         operators = [str(args[i]) for i in range(1, len(args), 2)]
 
-        all_chainable = all(op in chainable_ops for op in operators)
-        all_equality = all(op in equality_ops for op in operators)
+        all_chainable = all(op in CHAINABLE_OPERATORS for op in operators)
+        all_equality = all(op in EQUALITY_OPERATORS for op in operators)
 
         if all_chainable or all_equality:
             left, op, right = args[0], args[1], args[2]
             expr = Call(
-                Variable(str(op), pos=_tokpos(op)),
+                _operator(op),
                 [left, right],
                 pos=Pos(args[0].pos.start, args[-1].pos.end),
             )
@@ -187,7 +214,7 @@ class AstGenerator(Transformer):
                 right_of_new_link = args[i + 1]
 
                 next_comp = Call(
-                    Variable(str(op), pos=_tokpos(op)),
+                    _operator(op),
                     [left_of_new_link, right_of_new_link],
                     pos=_tokpos(op),
                 )
@@ -201,7 +228,7 @@ class AstGenerator(Transformer):
             return expr
         else:
             result = Call(
-                Variable(str(args[1]), pos=_tokpos(args[1])),
+                _operator(args[1]),
                 [args[0], args[2]],
                 pos=Pos(args[0].pos.start, args[2].pos.end),
             )
@@ -210,7 +237,7 @@ class AstGenerator(Transformer):
                 op = args[i]
                 right = args[i + 1]
                 result = Call(
-                    Variable(str(op), pos=_tokpos(op)),
+                    _operator(op),
                     [result, right],
                     pos=Pos(args[0].pos.start, right.pos.end),
                 )
@@ -222,19 +249,19 @@ class AstGenerator(Transformer):
 
     def neg(self, op, value):
         return Call(
-            Variable(str(op), pos=_tokpos(op)),
+            _operator(op),
             [value],
             pos=Pos(op.start_pos, value.pos.end),
         )
 
     def not_op(self, op, value):
-        return Call(Variable(str(op), pos=_tokpos(op)), [value], pos=_tokpos(op))
+        return Call(_operator(op), [value], pos=_tokpos(op))
 
     def variable(self, name):
-        return Variable(str(name), pos=_tokpos(name))
+        return Variable(sys.intern(str(name)), pos=_tokpos(name))
 
     def number(self, n):
-        return Number(str(n), pos=_tokpos(n))
+        return Number(sys.intern(str(n)), pos=_tokpos(n))
 
     def string(self, s):
         return String(codecs.decode(s[1:-1], "unicode_escape"), pos=_tokpos(s))
@@ -253,7 +280,7 @@ class AstGenerator(Transformer):
         this.value = "..." + this.value
         return this
 
-    def lambda_def(self, tree, params, body):
+    def lambda_def(self, source, params, body):
         for param in params.children:
             self._check_name(param.value, "function parameters", _tokpos(param))
 
@@ -269,7 +296,7 @@ class AstGenerator(Transformer):
             arg_names,
             body,
             pos=pos,
-            tree=bytes.fromhex(tree),
+            tree=source.tree,
         )
 
     def let_binding(self, _let, lambda_params, _in=None, body=None):
@@ -383,7 +410,7 @@ class AstGenerator(Transformer):
                     [Token("SPREAD", "..."), ast_to_lark_tree(ast_node.value)],  # type: ignore
                 )
             elif isinstance(ast_node, Lambda):
-                return pickle.loads(zlib.decompress(ast_node.tree))
+                return ast_node.tree
             else:
                 raise ValueError(
                     f"Cannot convert AST node {type(ast_node)} to Lark tree"
@@ -413,7 +440,7 @@ class AstGenerator(Transformer):
         return Lambda(
             arg_names=["...args"],
             body=construct_ast(),
-            tree=zlib.compress(pickle.dumps(lambda_tree)),
+            tree=lambda_tree,
             pos=_tokpos(pipes[0]) if pipes else Pos(0, 0),
         )
 
@@ -506,9 +533,25 @@ class AstGenerator(Transformer):
         else:
             return Export(
                 names=[Variable(a.value, _tokpos(a)) for a in args],
+                pos=Pos(_export.start_pos, args[-1].end_pos),
             )
 
 
+_lark = None
+
+
+def get_lark() -> Lark:
+    """
+    Return the LALR parser for the grammar, built on first use and shared by
+    all `Parser` instances. Lark keeps the parse tables in its disk cache, so
+    later processes load them instead of analysing the grammar again.
+    """
+    global _lark
+    if _lark is None:
+        _lark = Lark(grammar, parser="lalr", maybe_placeholders=False, cache=True)
+    return _lark
+
+
 class Parser:
     """
     Main parser class that coordinates the parsing pipeline.
@@ -523,14 +566,14 @@ class Parser:
     def __init__(self, fatal: bool = True):
         self.fatal = fatal
 
-        self.parser = Lark(grammar, parser="lalr", maybe_placeholders=False)
+        self.parser = get_lark()
         self.lambda_preprocessor = LambdaPreprocessor()
         self.generator = AstGenerator()
 
     def parse(self, code: str, path: str | Path | None) -> list[Expr] | None:
         self.module = Module(
             path=str(path) if path else "unknown",
-            code=zlib.compress(code.encode("utf-8")),
+            code=code.encode("utf-8"),
         )
 
         try:
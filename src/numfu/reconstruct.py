@@ -5,13 +5,10 @@ This module reconstructs NumFu source code from ASTs,
 primarily used for displaying partially applied functions and closures
 in the REPL. It reverses the parsing process to show readable code.
 
-Lambda AST objects save their Lark parse tree which can be reconstructed
+Lambda AST objects keep their Lark parse tree which can be reconstructed
 by Lark's reconstructor.
 """
 
-import pickle
-import zlib
-
 import lark
 import lark.reconstruct
 import mpmath
@@ -34,7 +31,7 @@ def tree_repr(node, precision: int = 15, env: dict = {}):
             ],  # type: ignore
         )
     elif isinstance(node, Lambda):
-        value = pickle.loads(zlib.decompress(node.tree))
+        value = node.tree
     elif isinstance(node, Variable):
         value = env.get(node.name, node)
         value = tree_repr(value, precision=precision, env=env)
@@ -86,7 +83,7 @@ def reconstruct(node: Lambda, precision: int = 15, env: dict = {}):
     """
     Reconstruct NumFu source code from a lambda function AST.
 
-    Takes a lambda with its serialized parse tree and closure environment,
+    Takes a lambda with its parse tree and closure environment,
     then generates readable NumFu code that represents the function.
 
     Args:
@@ -98,13 +95,12 @@ def reconstruct(node: Lambda, precision: int = 15, env: dict = {}):
         String containing reconstructed NumFu code
     """
 
-    if not node.tree:
+    if node.tree is None:
         return None
     reconstructor = lark.reconstruct.Reconstructor(
         lark.Lark(grammar, parser="lalr", maybe_placeholders=False)
     )
-    tree = pickle.loads(zlib.decompress(node.tree))
     env = {k: v for k, v in node.curry.items() if k not in env}
 
-    tree = Resolver(precision=precision, env=env).transform(tree)
+    tree = Resolver(precision=precision, env=env).transform(node.tree)
     return reconstructor.reconstruct(tree)
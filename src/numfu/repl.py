@@ -5,19 +5,16 @@ Supports both normal evaluation mode and AST inspection mode
 for debugging and learning about NumFu's internal representation.
 """
 
+from collections.abc import Callable
 from pathlib import Path
-from typing import Callable
-
-import rich
-import rich.pretty
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.output.color_depth import ColorDepth
-from prompt_toolkit.styles import Style
+from typing import TYPE_CHECKING
 
 from ._version import __version__
 from .parser import Expr
 
+if TYPE_CHECKING:
+    import rich.pretty
+
 
 class REPL:
     """
@@ -47,7 +44,10 @@ class REPL:
         self,
         tree=None,
         actually_print=True,
-    ) -> tuple[Expr | list[Expr] | None, rich.pretty.Pretty | None]:
+    ) -> tuple[Expr | list[Expr] | None, "rich.pretty.Pretty | None"]:
+        import rich
+        import rich.pretty
+
         if tree is None:
             return (None, None)
 
@@ -69,6 +69,11 @@ class REPL:
         intro=f"NumFu v{__version__} REPL. Type 'exit' or press Ctrl+D to exit.",
     ):
         """Start a REPL."""
+        # prompt_toolkit takes long to import and only the REPL needs it
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.history import FileHistory
+        from prompt_toolkit.output.color_depth import ColorDepth
+        from prompt_toolkit.styles import Style
 
         session = PromptSession(
             history=FileHistory(str(self.history_path)),
@@ -4,34 +4,43 @@ Type Checking and Built-in Function Infrastructure
 
 import itertools
 import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from types import UnionType
-from typing import Any, Callable, get_args
+from typing import Any, get_args
 
 import mpmath as mpm
 
-from .ast_types import Call, List, Pos
+from .ast_types import List, Pos
 from .classes import Module, State
 from .errors import nAssertionError, nIndexError, nRuntimeError, nTypeError
 
-OPERATORS = (
-    "+",
-    "-",
-    "*",
-    "/",
-    "^",
-    "%",
-    "<",
-    ">",
-    "<=",
-    ">=",
-    "==",
-    "!=",
-    "&&",
-    "||",
+_NUMBER = re.compile(r"(-|\+)*((0|[1-9][\d_]*)(\.[\d_]+)?|\.[\d_]+)([eE][+-]?[\d_]+)?")
+
+OPERATORS = frozenset(
+    (
+        "+",
+        "-",
+        "*",
+        "/",
+        "^",
+        "%",
+        "<",
+        ">",
+        "<=",
+        ">=",
+        "==",
+        "!=",
+        "&&",
+        "||",
+    )
 )
 
 
+# builtins whose calls are handled by BuiltinFunc._invoke itself
+SPECIAL_BUILTINS = ("String", "format", "error", "assert", "filter", "range", "set")
+
+
 def check_type(val, typ):
     if typ is Any:
         return True
@@ -48,6 +57,37 @@ def check_type(val, typ):
     return isinstance(val, typ)
 
 
+def _has_list_of(typ) -> bool:
+    if isinstance(typ, ListOf):
+        return True
+    if isinstance(typ, tuple):
+        return any(_has_list_of(t) for t in typ)
+    if isinstance(typ, UnionType):
+        return any(_has_list_of(t) for t in get_args(typ))
+    return False
+
+
+def _classes(typ) -> list[type] | None:
+    """The classes a type consists of, or None if it is not made of classes only"""
+    if isinstance(typ, tuple):
+        members = list(typ)
+    elif isinstance(typ, UnionType):
+        members = list(get_args(typ))
+    else:
+        members = [typ]
+    # typing.Any is a class itself since Python 3.11
+    if all(isinstance(t, type) and t is not Any for t in members):
+        return members
+    return None
+
+
+def _may_accept(typ, cls: type) -> bool:
+    """Whether values of exactly the class `cls` could pass `check_type` for `typ`"""
+    if (classes := _classes(typ)) is None:
+        return True  # Any, ListOf and nested unions are not worth analysing
+    return any(issubclass(cls, t) for t in classes)
+
+
 def type_name(t):
     if t is Any:
         return "any"
@@ -96,7 +136,6 @@ class InfiniteOf:
         self.element_type = element_type
 
 
-@dataclass
 class Validators:
     @staticmethod
     def mul_integer(x):
@@ -117,11 +156,7 @@ class Validators:
         if isinstance(x, (bool, mpm._ctx_mp._mpf)):
             return True
 
-        return bool(
-            re.match(
-                r"(-|\+)*((0|[1-9][\d_]*)(\.[\d_]+)?|\.[\d_]+)([eE][+-]?[\d_]+)?", x
-            )
-        )
+        return bool(_NUMBER.match(x))
 
     @staticmethod
     def list_index(x):
@@ -162,6 +197,18 @@ class BuiltinFunc:
         help: Additional help messages for error reporting
     """
 
+    __slots__ = (
+        "_cache",
+        "_errors",
+        "_overloads",
+        "eval_lists",
+        "help",
+        "is_operator",
+        "name",
+        "partial",
+        "resolved",
+    )
+
     def __init__(
         self,
         name,
@@ -176,6 +223,10 @@ class BuiltinFunc:
         self.is_operator = self.name in OPERATORS
         self._overloads = []
         self._errors = []
+        # maps argument type tuples to the overload they resolve to
+        self._cache: dict[tuple[type, ...], tuple] = {}
+        # argument type tuples whose overload can be called without any checks
+        self.resolved: dict[tuple[type, ...], Callable] = {}
 
     def add(
         self,
@@ -209,7 +260,7 @@ class BuiltinFunc:
                 raise ValueError("InfiniteOf type must be last")
         if commutative:
             for perm in itertools.permutations(range(len(arg_types))):
-                self._overloads.append(
+                self._register(
                     (
                         [arg_types[i] for i in perm],
                         return_type,
@@ -222,11 +273,47 @@ class BuiltinFunc:
                     )
                 )
         else:
-            self._overloads.append(
+            self._register(
                 (arg_types, return_type, func, help, validators, transformer)
             )
         return self
 
+    def _register(self, overload: tuple):
+        """
+        Append an overload and enter the argument type tuples it resolves to
+        into the dispatch tables right away. Overloads are tried in order, so
+        appending one never changes what earlier entries resolve to.
+        """
+        earlier = self._overloads[:]
+        self._overloads.append(overload)
+
+        arg_types, _, func, _, validators, transformer = overload
+        if transformer or any(isinstance(t, InfiniteOf) for t in arg_types):
+            return
+        classes = [_classes(t) for t in arg_types]
+        if any(c is None for c in classes):
+            return
+
+        for key in itertools.product(*classes):
+            if any(self._may_match(other, key) for other in earlier):
+                continue  # left to the scan in __call__
+            self._cache.setdefault(key, overload)
+            if not (validators or self.partial or self.name in SPECIAL_BUILTINS):
+                self.resolved.setdefault(key, func)
+
+    @staticmethod
+    def _may_match(overload: tuple, key: tuple[type, ...]) -> bool:
+        arg_types, _, _, _, _, transformer = overload
+        if arg_types and isinstance(arg_types[-1], InfiniteOf):
+            arg_types = arg_types[:-1] + (
+                [arg_types[-1].element_type] * (len(key) - len(arg_types) + 1)
+            )
+        if len(arg_types) != len(key):
+            return False
+        return bool(transformer) or all(
+            _may_accept(typ, cls) for typ, cls in zip(arg_types, key)
+        )
+
     def error(self, arg_types, error: str):
         self._errors.append((arg_types, error))
         return self
@@ -254,8 +341,27 @@ class BuiltinFunc:
         interpreter=None,
         state: State = State(),
     ):
+        key = tuple(map(type, args))
+        if (func := self.resolved.get(key)) is not None:
+            return func(*args)
+        if (overload := self._cache.get(key)) is not None:
+            _, _, func, _, validators, _ = overload
+            if all(not v or v(arg) for arg, v in zip(args, validators)):
+                return self._invoke(
+                    func,
+                    args,
+                    module,
+                    args_pos,
+                    func_pos,
+                    precision,
+                    interpreter,
+                    state,
+                )
+
         errors = []
-        for arg_types, _, func, help, validators, transformer in self._overloads:
+        cacheable = True
+        for overload in self._overloads:
+            arg_types, _, func, help, validators, transformer = overload
             if arg_types and isinstance(arg_types[-1], InfiniteOf):
                 arg_types = arg_types[:-1] + (
                     [arg_types[-1].element_type] * (len(args) - len(arg_types) + 1)
@@ -264,6 +370,10 @@ class BuiltinFunc:
             if len(args) != len(arg_types):
                 continue
 
+            # the outcome of this overload depends on more than the argument types
+            if transformer or any(_has_list_of(typ) for typ in arg_types):
+                cacheable = False
+
             if transformer:
                 args = transformer(*args)
 
@@ -285,69 +395,26 @@ class BuiltinFunc:
                         func_pos=func_pos,
                         args_pos=args_pos,
                     )
+                    cacheable = False
                     break
 
             else:
-                if not self.partial:
-                    if self.name in ("String", "format"):
-                        try:
-                            return func(*args, precision=precision)
-                        except IndexError as e:
-                            if self.name == "format":
-                                nIndexError(
-                                    "Incorrect number of placeholders",
-                                    args_pos,
-                                    module=module,
-                                )
-                            else:
-                                raise e
-                    elif self.name == "error":
-                        nRuntimeError(
-                            args[0],
-                            Pos(func_pos.start, args_pos.end),
-                            module=module,
-                            name=args[1] if len(args) == 2 else None,
-                        )
-                    elif self.name == "assert":
-                        if not args[0]:
-                            nAssertionError(
-                                "",
-                                args_pos,
-                                module=module,
-                            )
-                        else:
-                            return True if len(args) == 1 else args[1]
-                    elif self.name == "filter":
-                        if not interpreter:
-                            raise ValueError(
-                                "Missing interpreter reference for filter builtin function"
-                            )
-                        return List(
-                            [
-                                e
-                                for e in args[0].elements
-                                if interpreter._eval(
-                                    Call(func=args[1], args=[e], pos=func_pos),
-                                    state=state.edit(env=state.env | args[0].curry),
-                                )
-                            ],
-                            pos=args[0].pos,
-                            curry=args[0].curry,
-                        )
-                    elif self.name == "range":
-                        return List(
-                            [mpm.mpf(i) for i in range(int(args[0]), int(args[1]))],
-                            pos=func_pos,
-                        )
-                    elif self.name == "set" and isinstance(args[0], List):
-                        lst, i, value = args
-                        try:
-                            lst.elements[int(i)] = value
-                        except IndexError:
-                            nIndexError("Index out of range", args_pos, module)
-                        return lst
-
-                return func(*args)
+                if cacheable:
+                    self._cache[key] = overload
+                    if not (
+                        validators or self.partial or self.name in SPECIAL_BUILTINS
+                    ):
+                        self.resolved[key] = func
+                return self._invoke(
+                    func,
+                    args,
+                    module,
+                    args_pos,
+                    func_pos,
+                    precision,
+                    interpreter,
+                    state,
+                )
 
         for arg_types, message in self._errors:
             if all(check_type(arg, typ) for arg, typ in zip(args, arg_types)):
@@ -372,5 +439,96 @@ class BuiltinFunc:
             args_pos=args_pos,
         )
 
+    def direct(self, *args) -> Callable | None:
+        """
+        Return the implementation `args` dispatch to if it can be called
+        directly, i.e. without validators, transformers or special handling.
+        """
+        if self.partial or self.name in SPECIAL_BUILTINS:
+            return None
+        for arg_types, _, func, _, validators, transformer in self._overloads:
+            if arg_types and isinstance(arg_types[-1], InfiniteOf):
+                arg_types = arg_types[:-1] + (
+                    [arg_types[-1].element_type] * (len(args) - len(arg_types) + 1)
+                )
+            if len(args) != len(arg_types):
+                continue
+            if transformer or any(_has_list_of(typ) for typ in arg_types):
+                return None
+            if all(check_type(arg, typ) for arg, typ in zip(args, arg_types)):
+                return None if any(validators) else func
+        return None
+
+    def _invoke(
+        self,
+        func,
+        args,
+        module: Module,
+        args_pos: Pos,
+        func_pos: Pos,
+        precision: int,
+        interpreter,
+        state: State,
+    ):
+        if not self.partial:
+            if self.name in ("String", "format"):
+                try:
+                    return func(*args, precision=precision)
+                except IndexError as e:
+                    if self.name == "format":
+                        nIndexError(
+                            "Incorrect number of placeholders",
+                            args_pos,
+                            module=module,
+                        )
+                    else:
+                        raise e
+            elif self.name == "error":
+                nRuntimeError(
+                    args[0],
+                    Pos(func_pos.start, args_pos.end),
+                    module=module,
+                    name=args[1] if len(args) == 2 else None,
+                )
+            elif self.name == "assert":
+                if not args[0]:
+                    nAssertionError(
+                        "",
+                        args_pos,
+                        module=module,
+                    )
+                else:
+                    return True if len(args) == 1 else args[1]
+            elif self.name == "filter":
+                if not interpreter:
+                    raise ValueError(
+                        "Missing interpreter reference for filter builtin function"
+                    )
+                keep = interpreter._apply_each(
+                    args[1],
+                    args[0].elements,
+                    pos=func_pos,
+                    state=state.edit(env=state.env | args[0].curry),
+                )
+                return List(
+                    [e for e, k in zip(args[0].elements, keep) if k],
+                    pos=args[0].pos,
+                    curry=args[0].curry,
+                )
+            elif self.name == "range":
+                return List(
+                    [mpm.mpf(i) for i in range(int(args[0]), int(args[1]))],
+                    pos=func_pos,
+                )
+            elif self.name == "set" and isinstance(args[0], List):
+                lst, i, value = args
+                try:
+                    lst.elements[int(i)] = value
+                except IndexError:
+                    nIndexError("Index out of range", args_pos, module)
+                return lst
+
+        return func(*args)
+
     def __repr__(self) -> str:
         return f"{'Partial' if self.partial else ''}BuiltinFunction"
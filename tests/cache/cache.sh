@@ -0,0 +1,54 @@
+#!/bin/bash
+base_dir="tests/cache"
+cache_home=$(mktemp -d)
+trap 'chmod -R u+w "$cache_home"; rm -rf "$cache_home"' EXIT
+
+test_cache() {
+    local expected_output="$1"
+    local test_name="$2"
+    shift 2
+
+    echo "$test_name"
+
+    output=$(XDG_CACHE_HOME="$cache_home" numfu "$base_dir/program.nfu" "$@" 2>&1)
+
+    if [[ "$output" == "$expected_output" ]]; then
+        return 0
+    else
+        echo "❌ Test failed: expected '$expected_output'."
+        echo "$output"
+        exit 1
+    fi
+}
+
+cache_files() {
+    find "$cache_home" -name "*.nfut" | wc -l
+}
+
+test_cache "parsed" "Cache Disabled By Default Test"
+[[ $(cache_files) == 0 ]] || { echo "❌ Test failed: cache written without --cache."; exit 1; }
+
+test_cache "parsed" "Cache Miss Test" --cache
+[[ $(cache_files) == 1 ]] || { echo "❌ Test failed: cache not written."; exit 1; }
+
+# a hit loads the stored tree instead of parsing, so swapping it is visible
+cached=$(find "$cache_home" -name "*.nfut")
+numfu parse "$base_dir/other.nfu" -o "$cached" > /dev/null
+test_cache "cached" "Cache Hit Test" --cache
+test_cache "parsed" "No Cache Test" --no-cache
+
+printf 'NFU-TREE-FILE\x80\x05garbage' > "$cached"
+test_cache "parsed" "Corrupt Cache File Test" --cache
+! grep -q garbage "$cached" || { echo "❌ Test failed: corrupt cache file kept."; exit 1; }
+test_cache "parsed" "Replaced Cache File Test" --cache
+
+rm -rf "${cache_home:?}"/*
+mkdir "$cache_home/numfu"
+chmod a-w "$cache_home/numfu"
+test_cache "parsed" "Read-Only Cache Directory Test" --cache
+chmod u+w "$cache_home/numfu"
+
+# a file where the directory should be cannot be written to even by root
+rm -rf "${cache_home:?}/numfu"
+touch "$cache_home/numfu"
+test_cache "parsed" "Unusable Cache Directory Test" --cache
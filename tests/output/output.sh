@@ -0,0 +1,50 @@
+#!/bin/bash
+base_dir="tests/output"
+
+test_output() {
+    local file="$1"
+    local expected_output="$2"
+    local test_name="$3"
+    shift 3
+
+    echo "$test_name ($file)"
+
+    output=$(numfu "$file" "$@" 2>&1)
+
+    if [[ "$output" == *"$expected_output"* ]]; then
+        return 0
+    else
+        echo "❌ Test failed: '$expected_output' not found in output."
+        echo "$output"
+        exit 1
+    fi
+}
+
+test_same_output() {
+    local file="$1"
+    local test_name="$2"
+    local options="$3"
+    shift 3
+
+    echo "$test_name ($file)"
+
+    expected_output=$(numfu "$file" "$@" 2>&1)
+    output=$(numfu "$file" "$@" $options 2>&1)
+
+    if [[ "$output" == "$expected_output" ]]; then
+        return 0
+    else
+        echo "❌ Test failed: output changed with '$options'."
+        diff <(echo "$expected_output") <(echo "$output")
+        exit 1
+    fi
+}
+
+test_output "$base_dir/shadowed_parameter.nfu" "{x->x}" "Shadowed Parameter Printing Test"
+test_output "$base_dir/sort_precision.nfu" "[1, 9007199254740992, 9007199254740993, 9007199254740994]" "Sort Integers Above 2^53 Test" --precision 30
+test_output "$base_dir/sort_precision.nfu" $'\n9007199254740993\n' "Max Integers Above 2^53 Test" --precision 30
+test_output "$base_dir/sort_precision.nfu" "[0.25, 0.3333333333333333, 0.33333333333333333333, 0.333333333333333333333333333333]" "Sort Inexact Doubles Test" --precision 30
+test_output "$base_dir/sort_precision.nfu" $'\n0.3333333333333333\nend' "Min Inexact Doubles Test" --precision 30
+test_output "$base_dir/trig.nfu" $'0.841470984807897\n37320539.6343548' "Exact Trigonometry Test"
+test_output "$base_dir/trig.nfu" $'0.84147089465881\n37320554.2759546' "Fast Trigonometry Test" --fast-trig
+test_same_output "$base_dir/parallel_map.nfu" "Parallel Map Test" "--workers 2" --precision 60